@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
 """
-<Description>
+Shared helpers for the tracking tests.
 """
 
+from tools.tracking.tracking_region import TrackingRegion
+
 __author__ = "Jakrin Juangbhanich"
 __copyright__ = "Copyright 2018, GenVis Pty Ltd."
-__email__ = "juangbhanich.k@gmail.com"
\ No newline at end of file
+__email__ = "juangbhanich.k@gmail.com"
+
+
+def box(x: int, y: int, size: int = 20) -> TrackingRegion:
+    """ A square detection with its top left corner at (x, y). """
+    return TrackingRegion(x, x + size, y, y + size)
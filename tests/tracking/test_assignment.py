@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking import assignment
+from tools.tracking.assignment import GreedyAssignment, LinearAssignment
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestAssignment(TestCase):
+    def setUp(self):
+        # Greedy takes (0, 0) first and leaves row 1 without a partner.
+        self.costs = np.array([[1.0, 2.0],
+                               [1.5, 9.0]])
+        self.mask = np.array([[True, True],
+                              [True, False]])
+
+    def test_greedy(self):
+        self.assertEqual(GreedyAssignment().assign(self.costs, self.mask), [(0, 0)])
+
+    def test_linear(self):
+        matches = sorted(LinearAssignment().assign(self.costs, self.mask))
+        self.assertEqual(matches, [(0, 1), (1, 0)])
+
+    def test_linear_respects_mask(self):
+        mask = np.array([[True, False],
+                         [False, False]])
+        self.assertEqual(LinearAssignment().assign(self.costs, mask), [(0, 0)])
+
+    def test_get_blocks(self):
+        mask = np.zeros((4, 4), dtype=bool)
+        mask[0, 0] = mask[1, 0] = mask[1, 1] = True
+        mask[3, 3] = True
+        rows, cols = np.nonzero(mask)
+        blocks = assignment.get_blocks(rows, cols, mask.shape)
+        self.assertEqual([b.tolist() for b in blocks], [[0, 1, 2], [3]])
+
+    def test_numpy_solver(self):
+        rng = np.random.RandomState(0)
+        for n, m in [(5, 5), (3, 7), (7, 3)]:
+            costs = rng.rand(n, m)
+            rows, cols = assignment._solve_hungarian(costs) if n <= m else assignment._solve_hungarian(costs.T)[::-1]
+            best = min(self._brute_force(costs), key=lambda total: total)
+            self.assertAlmostEqual(costs[rows, cols].sum(), best)
+
+    @staticmethod
+    def _brute_force(costs: np.ndarray):
+        from itertools import permutations
+        n, m = costs.shape
+        if n <= m:
+            return [sum(costs[i, p[i]] for i in range(n)) for p in permutations(range(m), n)]
+        return [sum(costs[p[j], j] for j in range(m)) for p in permutations(range(n), m)]
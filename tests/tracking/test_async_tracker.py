@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+import asyncio
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tests.tracking import box
+from tools.tracking.async_tracker import AsyncTracker, Overflow
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestAsyncTracker(TestCase):
+    def test_process_in_order(self):
+        async def run():
+            tracker = AsyncTracker(ProximityTracker, max_pending=100)
+            futures = [tracker.submit(stream, i, [box(10 + i, 10)]) for i in range(6) for stream in ("a", "b")]
+            results = await asyncio.gather(*futures)
+            return tracker, results
+
+        tracker, results = asyncio.run(run())
+        self.assertEqual([r.frame_index for r in results if r.stream_id == "a"], list(range(6)))
+        self.assertEqual(len(results[-1].live_regions), 1)
+        self.assertEqual(len(tracker._streams["a"].tracker.all_tracklets), 1)
+
+    def test_overflow(self):
+        async def run(overflow: Overflow):
+            tracker = AsyncTracker(ProximityTracker, max_pending=2, overflow=overflow)
+            futures = [tracker.submit("a", i, [box(10, 10)]) for i in range(5)]
+            self.assertEqual(tracker.get_pending_count("a"), 2)
+            return [r.frame_index for r in await asyncio.gather(*futures)]
+
+        self.assertEqual(asyncio.run(run(Overflow.DROP_OLDEST)), [3, 3, 3, 3, 4])
+        self.assertEqual(asyncio.run(run(Overflow.COALESCE)), [0, 4, 4, 4, 4])
+
+    def test_image_with_frame(self):
+        async def run():
+            tracker = AsyncTracker(ProximityTracker, max_pending=100)
+            images = [np.full((100, 100, 3), i, dtype=np.uint8) for i in range(5)]
+            futures = [tracker.submit("a", i, [box(10, 10)], images[i]) for i in range(5)]
+            await asyncio.gather(*futures)
+            return tracker._streams["a"].tracker
+
+        # The tracklet goes live on its third hit, and is cropped out of that frame's image, even though the later
+        # frames were already queued.
+        tracklet = asyncio.run(run()).all_tracklets[0]
+        self.assertTrue((tracklet.image == 2).all())
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking.benchmark import run_benchmark, run_suite
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.synthetic_scene import SceneConfig, generate_scene
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestBenchmark(TestCase):
+    def test_scene_is_deterministic(self):
+        config = SceneConfig(object_count=5, frame_count=20, clutter=2.0, seed=3)
+        a, b = generate_scene(config), generate_scene(config)
+        for frame_a, frame_b in zip(a, b):
+            self.assertEqual([(r.left, r.top, r.data.get("object_id")) for r in frame_a.detections],
+                             [(r.left, r.top, r.data.get("object_id")) for r in frame_b.detections])
+            np.testing.assert_array_equal(frame_a.rects, frame_b.rects)
+
+    def test_run_suite(self):
+        scenes = {"small": SceneConfig(object_count=5, frame_count=20)}
+        results = run_suite({"proximity": ProximityTracker}, scenes)
+
+        self.assertEqual(len(results), 1)
+        result = results[0]
+        self.assertEqual(result.frame_count, 20)
+        self.assertGreater(result.frames_per_second, 0)
+        self.assertGreater(result.peak_memory, 0)
+        self.assertEqual(list(result.get_percentiles("process")), [50, 95, 99])
+
+    def test_instrument(self):
+        frames = generate_scene(SceneConfig(object_count=5, frame_count=20))
+        result = run_benchmark(ProximityTracker, frames, measure_memory=False, instrument=True)
+        self.assertEqual(len(result.latencies["process/gating"]), 20)
+        self.assertIsNone(result.peak_memory)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking.detection_log import DetectionLogWriter, open_log
+from tools.tracking.tracking_region import TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+def _box(x: int, label: str = None) -> TrackingRegion:
+    region = TrackingRegion(x, x + 10, 5, 25)
+    region.confidence = 0.75
+    region.label = label
+    return region
+
+
+class TestDetectionLog(TestCase):
+    def test_write_and_replay(self):
+        with tempfile.TemporaryDirectory() as path:
+            with DetectionLogWriter(path, chunk_size=3) as writer:
+                writer.write(10, [_box(0, "car"), _box(50)])
+                writer.write(11, [])
+                writer.write(12, [_box(100, "person")])
+
+            # Appending carries on from the end of the log.
+            with DetectionLogWriter(path) as writer:
+                writer.write(13, [_box(150, "car")])
+
+            log = open_log(path)
+            self.assertEqual(len(log), 4)
+            self.assertIsInstance(log.arrays["rects"], np.memmap)
+
+            frames = list(log.iter_frames())
+            self.assertEqual([frame_index for frame_index, _ in frames], [10, 11, 12, 13])
+            self.assertEqual([len(regions) for _, regions in frames], [2, 0, 1, 1])
+            self.assertEqual([r.label for _, regions in frames for r in regions], ["car", None, "person", "car"])
+            self.assertEqual((frames[2][1][0].left, frames[2][1][0].bottom), (100, 25))
+            self.assertAlmostEqual(frames[0][1][0].confidence, 0.75)
+            np.testing.assert_array_equal(log.get_region_array(0).left, [0, 50])
+
+    def test_open_before_flush(self):
+        with tempfile.TemporaryDirectory() as path:
+            self.assertEqual(len(open_log(path)), 0)
+
+            with DetectionLogWriter(path) as writer:
+                writer.write(0, [_box(0)])
+                self.assertEqual(len(open_log(path)), 0)
+                self.assertEqual(list(open_log(path).iter_frames()), [])
+            self.assertEqual(len(open_log(path)), 1)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking.kalman_filter import KalmanFilter
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestKalmanFilter(TestCase):
+    def test_learns_velocity(self):
+        kalman = KalmanFilter(capacity=1)
+        slots = kalman.add([[0, 0, 20, 20], [100, 100, 20, 20]])
+        self.assertEqual(kalman.count, 2)
+
+        for i in range(1, 30):
+            kalman.predict(slots)
+            kalman.update(slots, [[i * 5, 0, 20, 20], [100, 100 - i * 3, 20, 20]])
+
+        np.testing.assert_allclose(kalman.get_velocities(slots), [[5, 0], [0, -3]], atol=0.1)
+        kalman.predict(slots, steps=2)
+        np.testing.assert_allclose(kalman.get_boxes(slots)[:, :2], [[155, 0], [100, 7]], atol=0.5)
+
+    def test_slots_are_reused(self):
+        kalman = KalmanFilter(capacity=2)
+        slots = kalman.add([[0, 0, 10, 10], [5, 5, 10, 10]])
+        kalman.remove(slots[:1])
+        self.assertEqual(kalman.add([[1, 1, 10, 10]]).tolist(), [slots[0]])
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+from unittest import TestCase
+
+from tools.tracking.mot_metrics import MotAccumulator, evaluate
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.synthetic_scene import SceneConfig, generate_scene
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+BOX = [0, 20, 0, 20]
+FAR_BOX = [500, 520, 500, 520]
+
+
+class TestMotMetrics(TestCase):
+    def test_evaluate(self):
+        # Tracked, missed, picked up again by a new ID, plus a false positive at the end.
+        gt = [([0], [BOX])] * 4
+        hypotheses = [([10], [BOX]), ([], []), ([11], [BOX]), ([11, 12], [BOX, FAR_BOX])]
+        metrics = evaluate(gt, hypotheses)
+
+        self.assertEqual((metrics.match_count, metrics.misses, metrics.false_positives), (3, 1, 1))
+        self.assertEqual((metrics.id_switches, metrics.fragmentations), (1, 1))
+        self.assertAlmostEqual(metrics.mota, 0.25)
+        self.assertAlmostEqual(metrics.motp, 1.0)
+        self.assertAlmostEqual(metrics.idf1, 0.5)
+
+    def test_keeps_previous_match(self):
+        # The second hypothesis overlaps more, but the first one is still valid, so there is no switch.
+        gt = [([0], [[0, 100, 0, 100]])] * 2
+        hypotheses = [([1], [[0, 100, 0, 100]]), ([1, 2], [[10, 110, 0, 100], [0, 100, 0, 100]])]
+        metrics = evaluate(gt, hypotheses)
+        self.assertEqual((metrics.id_switches, metrics.false_positives), (0, 1))
+
+    def test_shared_previous_match(self):
+        # Both objects were last matched to the same hypothesis, but only one of them can keep it.
+        gt = [([0], [BOX]), ([1], [BOX]), ([0, 1], [BOX, BOX])]
+        hypotheses = [([1], [BOX])] * 3
+        metrics = evaluate(gt, hypotheses)
+        self.assertEqual((metrics.match_count, metrics.misses, metrics.false_positives), (3, 1, 0))
+        self.assertLessEqual(metrics.mota, 1.0)
+
+    def test_update_tracker(self):
+        accumulator = MotAccumulator()
+        tracker = ProximityTracker()
+        for frame in generate_scene(SceneConfig(object_count=5, frame_count=50, noise=0.0, dropout=0.0,
+                                                occlusion=0.0, clutter=0.0, max_speed=2.0)):
+            tracker.process(frame.detections, frame.frame_index)
+            accumulator.update_tracker(frame.object_ids, frame.rects, tracker)
+
+        metrics = accumulator.compute()
+        self.assertEqual(metrics.frame_count, 50)
+        self.assertEqual(metrics.id_switches, 0)
+        self.assertGreater(metrics.mota, 0.9)
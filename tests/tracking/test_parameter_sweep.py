@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+from unittest import TestCase
+
+from tools.tracking.detection_sequence import DetectionSequence
+from tools.tracking.parameter_sweep import sweep
+from tools.tracking.synthetic_scene import SceneConfig, generate_scene
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestParameterSweep(TestCase):
+    def test_sweep(self):
+        sequence = DetectionSequence.from_scene(generate_scene(SceneConfig(object_count=5, frame_count=30)))
+        grid = {"reach": [0.5, 2.0], "hit_limit": [1, 3]}
+
+        results = sweep(sequence, grid, workers=2)
+        self.assertEqual([(r["reach"], r["hit_limit"]) for r in results], [(0.5, 1), (0.5, 3), (2.0, 1), (2.0, 3)])
+        self.assertTrue(all(r["frames_per_second"] > 0 for r in results))
+
+        # Same accuracy when run in this process, straight from the original arrays.
+        serial = sweep(sequence, grid, workers=0)
+        self.assertEqual([r["mota"] for r in results], [r["mota"] for r in serial])
+        self.assertNotEqual(results[0]["mota"], results[1]["mota"])
+
+        # A grid without any combinations runs nothing, with or without workers.
+        self.assertEqual(sweep(sequence, {"reach": []}, workers=2), [])
+        self.assertEqual(sweep(sequence, {"reach": []}, workers=0), [])
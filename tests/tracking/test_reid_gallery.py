@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.reid_gallery import ReidGallery
+from tools.tracking.tracking_region import TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+RED = (0, 0, 255)
+BLUE = (255, 0, 0)
+
+
+def _patch(color, size: int = 20) -> np.ndarray:
+    return np.full((size, size, 3), color, dtype=np.uint8)
+
+
+class TestReidGallery(TestCase):
+    def test_match(self):
+        gallery = ReidGallery(capacity=2)
+        gallery.add([1, 2, 3], [_patch(RED), _patch(BLUE), _patch((0, 255, 0))], ["a", "b", "c"])
+        self.assertEqual(len(gallery), 2)  # The first one was dropped.
+
+        matches = gallery.match([_patch(BLUE, 30), _patch(RED)])
+        self.assertEqual(matches, [(0, 2, "b")])
+        self.assertEqual(len(gallery), 1)
+
+    def test_single_channel(self):
+        gallery = ReidGallery()
+        gallery.add([1, 2], [np.full((20, 20), 30, dtype=np.uint8), np.full((20, 20, 1), 220, dtype=np.uint8)])
+        self.assertEqual([m[:2] for m in gallery.match([np.full((16, 16), 220, dtype=np.uint8)])], [(0, 2)])
+
+    def test_tracker_reidentifies(self):
+        tracker = ProximityTracker(reid=ReidGallery())
+
+        def step(i: int, red_x: int = None):
+            image = np.zeros((200, 400, 3), dtype=np.uint8)
+            regions = [TrackingRegion(300, 320, 150, 170)]
+            image[150:170, 300:320] = BLUE
+            if red_x is not None:
+                regions.append(TrackingRegion(red_x, red_x + 20, 50, 70))
+                image[50:70, red_x:red_x + 20] = RED
+            tracker.process(regions, frame_index=i)
+            tracker.save_image(image)
+
+        for i in range(10):
+            step(i, red_x=50)
+        red = [t for t in tracker.active_tracklets if t.raw_region.left == 50][0]
+
+        # The red box leaves, and comes back somewhere else: a new tracklet, with the old identity.
+        for i in range(10, 20):
+            step(i)
+        for i in range(20, 30):
+            step(i, red_x=150)
+
+        returned = [t for t in tracker.active_tracklets if t.is_live and t.raw_region.left == 150][0]
+        self.assertIsNot(returned, red)
+        self.assertEqual((returned.identity, returned.color), (red.identity, red.color))
+        self.assertEqual(tracker.get_live_regions()[-1].data["identity"], red.identity)
+        self.assertEqual(len({t.identity for t in tracker.active_tracklets if t.is_live}), 2)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking.spatial_grid import SpatialGrid
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestSpatialGrid(TestCase):
+    def test_query_pairs_covers_radius(self):
+        rng = np.random.RandomState(0)
+        points = rng.uniform(0, 500, (300, 2))
+        queries = rng.uniform(-50, 550, (200, 2))
+        radii = rng.uniform(1, 60, 200)
+
+        grid = SpatialGrid(points, cell_size=np.median(radii))
+        point_indices, query_indices = grid.query_pairs(queries, radii)
+        found = set(zip(point_indices.tolist(), query_indices.tolist()))
+
+        distances = np.linalg.norm(points[:, np.newaxis] - queries[np.newaxis], axis=2)
+        expected = set(zip(*[i.tolist() for i in np.nonzero(distances < radii[np.newaxis])]))
+        self.assertTrue(expected.issubset(found))
+        self.assertLess(len(found), points.shape[0] * queries.shape[0] // 4)
+
+    def test_query_pairs_huge_radius(self):
+        # One query reaching across the whole grid is compared against every point, the others only nearby.
+        rng = np.random.RandomState(1)
+        points = rng.uniform(0, 1000, (500, 2))
+        queries = rng.uniform(0, 1000, (100, 2))
+        radii = np.full(100, 10.0)
+        radii[0] = 2000.0
+
+        grid = SpatialGrid(points, cell_size=10.0)
+        point_indices, query_indices = grid.query_pairs(queries, radii)
+        self.assertEqual(set(point_indices[query_indices == 0].tolist()), set(range(500)))
+        self.assertLess((query_indices != 0).sum(), 500)
+
+    def test_empty(self):
+        grid = SpatialGrid(np.zeros((0, 2)), cell_size=10)
+        point_indices, query_indices = grid.query_pairs(np.array([[1.0, 2.0]]), np.array([5.0]))
+        self.assertEqual(len(point_indices), 0)
+        self.assertEqual(len(query_indices), 0)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.track_export import TrackExporter, TrackReader
+from tools.tracking.tracking_region import TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+def _box(x: int, y: int, label: str = None) -> TrackingRegion:
+    region = TrackingRegion(x - 10, x + 10, y - 10, y + 10)
+    region.label = label
+    region.confidence = 0.5
+    return region
+
+
+class TestTrackExport(TestCase):
+    def test_export_dead_tracklets(self):
+        with tempfile.TemporaryDirectory() as path:
+            with TrackExporter(path, chunk_size=4) as exporter:
+                tracker = ProximityTracker(exporter=exporter)
+                for i in range(40):
+                    regions = [_box(100, 100 + i, "car")] if i < 10 else []
+                    if 5 <= i < 15:
+                        regions.append(_box(400, 400))
+                    tracker.process(regions, frame_index=i)
+
+            reader = TrackReader(path)
+            self.assertEqual(reader.tracklet_count, 2)
+            self.assertEqual(len(reader), 20)
+
+            rows = reader.get_rows(0)
+            np.testing.assert_array_equal(reader["frame"][rows], np.arange(10))
+            np.testing.assert_array_equal(reader["raw_rect"][rows][-1], [90, 110, 99, 119])
+            self.assertEqual(reader.get_labels(rows), ["car"] * 10)
+            self.assertEqual(reader.get_labels(reader.get_rows(1)), [None] * 10)
+            np.testing.assert_allclose(reader["confidence"], 0.5)
+            self.assertEqual([reader["identity"][reader.get_rows(i)].tolist() for i in range(2)],
+                             [[0] * 10, [1] * 10])
+
+            # Appending to an existing store carries on the tracklet IDs.
+            with TrackExporter(path) as exporter:
+                exporter.write(tracker.all_tracklets[:1])
+            self.assertEqual(TrackReader(path).tracklet_count, 3)
+
+    def test_export_headless(self):
+        # Exporting does not make the display regions that a headless tracker never read.
+        with tempfile.TemporaryDirectory() as path:
+            with TrackExporter(path) as exporter:
+                tracker = ProximityTracker(exporter=exporter, config=ProximityTracker.default_config(headless=True))
+                for i in range(30):
+                    tracker.process([_box(100, 100 + i)] if i < 10 else [], frame_index=i)
+
+            tracklet = tracker.all_tracklets[0]
+            self.assertFalse(any(f.has_display_region for f in tracklet.track_frames))
+            reader = TrackReader(path)
+            self.assertEqual(len(reader), 10)
+            np.testing.assert_array_equal(reader["display_rect"], reader["raw_rect"])
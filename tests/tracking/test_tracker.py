@@ -5,15 +5,285 @@
 """
 from unittest import TestCase
 
+from tools.tests.tracking import box
+from tools.tracking.assignment import LinearAssignment
+from tools.tracking.kalman_filter import KalmanFilter
+from tools.tracking.proximity_tracker.proximity_tracker import CostMode, ProximityTracker
+from tools.tracking.tracker import RetentionPolicy
+from tools.tracking.tracker_config import TrackerConfig
+from tools.tracking.tracking_region import TrackingRegion
+from tools.tracking.tracklet_bank import TrackletBank
+
 __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
 
 
 class TestTracker(TestCase):
     def test_reset(self):
-        pass
-        #self.fail()
+        tracker = ProximityTracker()
+        tracker.process([box(0, 0)])
+        tracker.reset()
+        self.assertEqual(len(tracker.active_tracklets), 0)
+        self.assertEqual(len(tracker.all_tracklets), 0)
 
     def test_process(self):
-        pass
-        #self.fail()
+        tracker = ProximityTracker()
+        for i in range(5):
+            tracker.process([box(10 + i * 2, 10), box(200, 200 + i * 2)], frame_index=i)
+
+        self.assertEqual(len(tracker.all_tracklets), 2)
+        self.assertEqual(len(tracker.get_live_regions()), 2)
+        for tracklet in tracker.all_tracklets:
+            self.assertEqual(len(tracklet.track_frames), 5)
+
+    def test_process_closest_pair_wins(self):
+        tracker = ProximityTracker()
+        tracker.process([box(100, 100)], frame_index=0)
+        tracker.process([box(120, 100), box(104, 100)], frame_index=1)
+
+        first = tracker.all_tracklets[0]
+        self.assertEqual(first.raw_region.x, 114)
+        self.assertEqual(len(tracker.all_tracklets), 2)
+
+    def test_process_out_of_reach(self):
+        tracker = ProximityTracker()
+        tracker.process([box(0, 0)], frame_index=0)
+        tracker.process([box(500, 500)], frame_index=1)
+        self.assertEqual(len(tracker.all_tracklets), 2)
+
+    def test_process_linear_assignment(self):
+        # Greedy would give the middle detection to the first tracklet, and orphan the second one.
+        greedy = ProximityTracker()
+        tracker = ProximityTracker(assignment=LinearAssignment())
+        for t in (greedy, tracker):
+            t.process([box(100, 100), box(122, 100)], frame_index=0)
+            t.process([box(110, 100), box(80, 100)], frame_index=1)
+
+        self.assertEqual(len(greedy.all_tracklets), 3)
+        self.assertEqual(len(tracker.all_tracklets), 2)
+        self.assertEqual([t.raw_region.x for t in tracker.all_tracklets], [90, 120])
+
+    def test_process_spatial_grid(self):
+        boxes = [[box(x * 40, y * 40, 10) for x in range(20) for y in range(20)]]
+        boxes.append([box(r.left + 3, r.top - 2, 10) for r in boxes[0]])
+
+        tracker = ProximityTracker()
+        tracker.GRID_MIN_PAIRS = 0
+        for i, regions in enumerate(boxes):
+            tracker.process(regions, frame_index=i)
+
+        self.assertEqual(len(tracker.all_tracklets), 400)
+        for tracklet in tracker.all_tracklets:
+            self.assertEqual(len(tracklet.track_frames), 2)
+
+    def test_process_iou_cost(self):
+        for cost_mode in (CostMode.IOU, CostMode.GIOU):
+            tracker = ProximityTracker(cost_mode=cost_mode)
+            tracker.process([box(100, 100, 40), box(300, 100, 40)], frame_index=0)
+            tracker.process([box(310, 105, 40), box(108, 96, 40)], frame_index=1)
+
+            self.assertEqual(len(tracker.all_tracklets), 2)
+            self.assertEqual([t.raw_region.x for t in tracker.all_tracklets], [128, 330])
+
+    def test_history_size(self):
+        tracker = ProximityTracker(history_size=3)
+        for i in range(10):
+            tracker.process([box(10 + i, 10)], frame_index=i)
+
+        tracklet = tracker.all_tracklets[0]
+        self.assertEqual(len(tracklet.track_frames), 3)
+        self.assertEqual(tracklet.first_frame.frame, 7)
+        self.assertEqual(tracklet.last_frame.frame, 9)
+
+    def test_retention(self):
+        retired = []
+        tracker = ProximityTracker(retention=RetentionPolicy(max_count=2, on_retire=retired.append))
+
+        # Each object only shows up for a moment, far away from the last one.
+        for i in range(30):
+            tracker.process([box(i * 100, 0)] if i % 10 == 0 else [], frame_index=i)
+
+        self.assertEqual(len(retired), 1)
+        self.assertEqual(len(tracker.all_tracklets), 2)
+        self.assertNotIn(retired[0], tracker.all_tracklets)
+
+        tracker.retention = RetentionPolicy(max_age=5)
+        tracker.process([], frame_index=100)
+        self.assertEqual(len(tracker.all_tracklets), 0)
+
+    def test_process_motion(self):
+        # Speeds up past the reach of the detection, which fragments the track without a motion model.
+        tracker = ProximityTracker(motion=KalmanFilter())
+        x = 0
+        for i in range(20):
+            x += min(20 + i * 2, 40)
+            tracker.process([box(x, 100)], frame_index=i)
+
+        self.assertEqual(len(tracker.all_tracklets), 1)
+        self.assertEqual(tracker.motion.count, 1)
+
+    def test_process_bank_matches_tracklets(self):
+        trackers = [ProximityTracker(), ProximityTracker(bank=TrackletBank(capacity=2))]
+        for i in range(40):
+            regions = [box(10 + i * 3, 10), box(300, 300 + i)]
+            if i % 5 != 0:
+                regions.append(box(150, 150))
+            if i < 12:
+                regions.append(box(500 - i * 4, 40))
+            for tracker in trackers:
+                tracker.process([r.clone() for r in regions], frame_index=i)
+
+            plain, banked = trackers
+            for a, b in zip(plain.all_tracklets, banked.all_tracklets):
+                self.assertEqual((a.is_recent, a.is_live, a.is_lost, a.is_displayable, a.visual_state),
+                                 (b.is_recent, b.is_live, b.is_lost, b.is_displayable, b.visual_state))
+                self.assertEqual(a.display_region.data["color"], b.display_region.data["color"])
+            self.assertEqual(len(plain.active_tracklets), len(banked.active_tracklets))
+
+    def test_snapshot_restore(self):
+        def scene(i):
+            return [box(10 + i * 25, 10), box(300, 300 + i * 2), box(150, 150 + i * 30)]
+
+        for make in (lambda: ProximityTracker(motion=KalmanFilter()), lambda: ProximityTracker(bank=TrackletBank())):
+            original = make()
+            for i in range(10):
+                original.process(scene(i), frame_index=i)
+
+            restored = make()
+            restored.restore(original.snapshot())
+            self.assertEqual(restored.frame_index, original.frame_index)
+            self.assertEqual(len(restored.active_tracklets), len(original.active_tracklets))
+
+            for i in range(10, 20):
+                original.process(scene(i), frame_index=i)
+                restored.process(scene(i), frame_index=i)
+                self.assertEqual([r.data["color"] for r in original.get_live_regions()],
+                                 [r.data["color"] for r in restored.get_live_regions()])
+                self.assertEqual([(r.x, r.y) for r in original.get_live_regions()],
+                                 [(r.x, r.y) for r in restored.get_live_regions()])
+
+    def test_snapshot_size(self):
+        # Only the last frames are saved by default, so the snapshot does not grow with the history.
+        tracker = ProximityTracker()
+        sizes = []
+        for i in range(200):
+            tracker.process([box(10 + i, 10), box(300, 10 + i)], frame_index=i)
+            if i in (9, 199):
+                sizes.append(len(tracker.snapshot()))
+        self.assertEqual(sizes[0], sizes[1])
+        self.assertGreater(len(tracker.snapshot(full_history=True)), 5 * sizes[1])
+
+        restored = ProximityTracker()
+        restored.restore(tracker.snapshot(full_history=True))
+        self.assertEqual(len(restored.active_tracklets[0].track_frames), 200)
+
+    def test_snapshot_headless(self):
+        config = ProximityTracker.default_config(headless=True)
+        original = ProximityTracker(config=config)
+        for i in range(5):
+            original.process([box(10 + i * 5, 10)], frame_index=i)
+
+        # Saving does not make the lazy display regions, and the restored ones are made the same way when read.
+        restored = ProximityTracker(config=config)
+        restored.restore(original.snapshot())
+        self.assertTrue(all(f._display_region is None for f in original.active_tracklets[0].track_frames))
+        self.assertEqual([r.get_state() for r in restored.get_live_regions()],
+                         [r.get_state() for r in original.get_live_regions()])
+
+    def test_config(self):
+        tracker = ProximityTracker(config=TrackerConfig(hit_limit=1, display=False, color=(1, 2, 3)))
+        for i in range(3):
+            tracker.process([box(10 + i * 5, 10)], frame_index=i)
+
+        # Live after a single hit, and the display region is the raw detection, with no smoothing.
+        tracklet = tracker.active_tracklets[0]
+        self.assertTrue(tracklet.is_live)
+        self.assertIs(tracklet.last_frame.display_region, tracklet.last_frame.raw_region)
+        self.assertEqual((tracklet.display_region.x, tracklet.display_region.data["color"]), (30, (1, 2, 3)))
+
+    def test_default_config(self):
+        config = ProximityTracker.default_config(hit_limit=1)
+        self.assertEqual(config.hit_limit, 1)
+        self.assertEqual((config.ratio_lock, config.scale_factor, config.color), (1.0, 1.5, (255, 150, 30)))
+
+        tracker = ProximityTracker(config=config)
+        tracker.process([box(10, 10)], frame_index=0)
+        region = tracker.get_live_regions()[0]
+        self.assertEqual((region.width, region.data["color"]), (30, (255, 150, 30)))
+
+    def test_headless(self):
+        tracker = ProximityTracker(config=TrackerConfig(headless=True, ratio_lock=1.0, scale_factor=2.0))
+        for i in range(4):
+            tracker.process([box(10 + i * 5, 10)], frame_index=i)
+
+        # Display regions are only made when they are read, and have no animation color.
+        frames = tracker.active_tracklets[0].track_frames
+        self.assertTrue(all(f._display_region is None for f in frames))
+        region = tracker.get_live_regions()[0]
+        self.assertNotIn("color", region.data)
+        self.assertEqual((region.x, region.width), (35, 40))
+        self.assertIsNone(frames[0]._display_region)
+
+    def test_class_aware(self):
+        def labeled(x: int, label: str) -> TrackingRegion:
+            region = box(x, 10)
+            region.label = label
+            return region
+
+        for class_aware, expected in ((False, 1), (True, 2)):
+            tracker = ProximityTracker(config=ProximityTracker.default_config(class_aware=class_aware))
+            tracker.process([labeled(10, "car")], frame_index=0)
+            tracker.process([labeled(12, "person")], frame_index=1)
+            self.assertEqual(len(tracker.all_tracklets), expected)
+
+    def test_confidence_tiers(self):
+        def scored(x: int, confidence: float) -> TrackingRegion:
+            region = box(x, 10)
+            region.confidence = confidence
+            return region
+
+        tracker = ProximityTracker(config=ProximityTracker.default_config(high_confidence=0.5))
+        tracker.process([scored(10, 0.9)], frame_index=0)
+
+        # The confident detection gets the tracklet, even though the weak one is closer.
+        # Weak detections that are left over do not start new tracklets.
+        tracker.process([scored(20, 0.9), scored(12, 0.2), scored(300, 0.2)], frame_index=1)
+        self.assertEqual(len(tracker.all_tracklets), 1)
+        self.assertEqual(tracker.all_tracklets[0].last_frame.raw_region.left, 20)
+
+        # But a weak detection can still extend a tracklet that nothing else matched.
+        tracker.process([scored(22, 0.2)], frame_index=2)
+        self.assertEqual(tracker.all_tracklets[0].last_frame.raw_region.left, 22)
+
+    def test_frame_gaps(self):
+        # Detections only every 5 frames, with the object moving 5 pixels per frame.
+        tracker = ProximityTracker(config=ProximityTracker.default_config(frame_gaps=True))
+        for frame_index in (0, 5, 10):
+            tracker.process([box(5 * frame_index, 10)], frame_index=frame_index)
+        tracklet = tracker.all_tracklets[0]
+        self.assertTrue(tracklet.is_activated)
+
+        # A longer gap is bridged along the last velocity, even though the detection is out of reach of the last one.
+        tracker.process([box(100, 10)], frame_index=20)
+        self.assertEqual(len(tracker.all_tracklets), 1)
+        self.assertEqual(tracklet.last_frame.raw_region.left, 100)
+
+        # Skipped frames can still be drawn.
+        predicted = tracker.predict_regions(22)
+        self.assertEqual(predicted[0].x - tracklet.display_region.x, 10)
+
+        # The misses count in frames too.
+        tracker.process([], frame_index=25)
+        self.assertFalse(tracklet.is_lost)
+        tracker.process([], frame_index=30)
+        self.assertTrue(tracklet.is_lost)
+
+    def test_frame_gaps_dropped_detection(self):
+        # The object is not detected at frames 15 and 20, so the tracklet has to be moved over 15 frames.
+        tracker = ProximityTracker(config=ProximityTracker.default_config(frame_gaps=True, miss_limit=20))
+        for frame_index in (0, 5, 10, 15, 20, 25):
+            regions = [] if frame_index in (15, 20) else [box(5 * frame_index, 10)]
+            tracker.process(regions, frame_index=frame_index)
+
+        self.assertEqual(len(tracker.all_tracklets), 1)
+        self.assertEqual(tracker.all_tracklets[0].last_frame.raw_region.left, 125)
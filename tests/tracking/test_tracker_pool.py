@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+from tools.tests.tracking import box
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.tracker_pool import TrackerPool
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestTrackerPool(TestCase):
+    def _run(self, workers: int):
+        with TrackerPool(ProximityTracker, workers=workers) as pool:
+            results = []
+            for i in range(5):
+                batch = [(camera, i, [box(10 + i, 10 * camera)] * (1 + camera % 2)) for camera in range(6)]
+                results = pool.submit(batch)
+            pool.remove(0)
+            restarted = pool.submit([(0, 5, [])])
+        return results, restarted
+
+    def test_submit(self):
+        for workers in (0, 2):
+            results, restarted = self._run(workers)
+            self.assertEqual([r.stream_id for r in results], list(range(6)))
+            self.assertEqual([len(r.live_regions) for r in results], [1, 2, 1, 2, 1, 2])
+            self.assertEqual(len(restarted[0].live_regions), 0)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+from unittest import TestCase
+
+from tools.tests.tracking import box
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.tracker_stats import TrackerStats
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestTrackerStats(TestCase):
+    def test_rolling_window(self):
+        stats = TrackerStats(window=3)
+        for i in range(5):
+            stats.start()
+            stats.add_pairs(i)
+            stats.lap(TrackerStats.GATING)
+            stats.finish(active_count=10 * i)
+
+        self.assertEqual(stats.frame_count, 5)
+        self.assertEqual(stats.get_pair_counts().tolist(), [2, 3, 4])
+        self.assertEqual(stats.get_active_counts().tolist(), [20, 30, 40])
+        self.assertEqual(len(stats.get_durations(TrackerStats.GATING)), 3)
+
+        summary = stats.get_summary()
+        self.assertEqual(summary["frames"], 5)
+        self.assertEqual(summary["pairs_mean"], 3)
+        self.assertEqual(summary["active_tracklets_max"], 40)
+
+    def test_tracker(self):
+        tracker = ProximityTracker(stats=TrackerStats())
+        tracker.process([box(10, 10), box(200, 10)], frame_index=0)
+        tracker.process([box(12, 10), box(202, 10), box(400, 10)], frame_index=1)
+
+        stats = tracker.stats
+        self.assertEqual(stats.frame_count, 2)
+        self.assertEqual(stats.get_pair_counts().tolist(), [0, 2])
+        self.assertEqual(stats.get_active_counts().tolist(), [2, 3])
+        for i in range(len(TrackerStats.STAGES)):
+            self.assertTrue((stats.get_durations(i) >= 0).all())
+
+        tracker.reset()
+        self.assertEqual(stats.get_summary(), {"frames": 0})
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+from tools.tracking.tracking_region import RegionData, TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestTrackingRegion(TestCase):
+    def test_clone_data_is_copy_on_write(self):
+        region = TrackingRegion(0, 10, 0, 10)
+        region.data["color"] = (1, 2, 3)
+        region.data["id"] = 7
+
+        clone = region.clone()
+        clone.data["color"] = (0, 0, 0)
+        del clone.data["id"]
+        region.data["extra"] = True
+
+        self.assertEqual(dict(region.data), {"color": (1, 2, 3), "id": 7, "extra": True})
+        self.assertEqual(dict(clone.data), {"color": (0, 0, 0)})
+        self.assertNotIn("id", clone.data)
+        self.assertEqual(len(clone.data), 1)
+
+    def test_data_setter(self):
+        region = TrackingRegion()
+        region.data = {"a": 1}
+        self.assertIsInstance(region.data, RegionData)
+        self.assertEqual(region.data, {"a": 1})
+
+        other = TrackingRegion()
+        other.data = region.data
+        other.data["a"] = 2
+        self.assertEqual(region.data["a"], 1)
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+
+__author__ = "Jakrin Juangbhanich"
+__copyright__ = "Copyright 2018, GenVis Pty Ltd."
+__email__ = "juangbhanich.k@gmail.com"
\ No newline at end of file
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from tools.util import region
+from tools.util.region import Region, RegionArray
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestRegion(TestCase):
+    def test_iou_matrix(self):
+        rects_a = region.get_rects([Region(0, 10, 0, 10), Region(100, 110, 100, 110)])
+        rects_b = region.get_rects([Region(5, 15, 0, 10), Region(0, 10, 0, 10), Region(50, 60, 0, 10)])
+        iou = region.iou_matrix(rects_a, rects_b)
+
+        self.assertEqual(iou.shape, (2, 3))
+        self.assertAlmostEqual(iou[0, 0], 50 / 150)
+        self.assertAlmostEqual(iou[0, 1], 1.0)
+        self.assertTrue(np.all(iou[1] == 0))
+
+    def test_giou_matrix(self):
+        rects_a = region.get_rects([Region(0, 10, 0, 10)])
+        rects_b = region.get_rects([Region(0, 10, 0, 10), Region(20, 30, 0, 10)])
+        giou = region.iou_matrix(rects_a, rects_b, generalized=True)
+
+        self.assertAlmostEqual(giou[0, 0], 1.0)
+        self.assertAlmostEqual(giou[0, 1], -100 / 300)
+
+    def test_paired_iou(self):
+        rects = region.get_rects([Region(0, 10, 0, 10), Region(0, 0, 0, 0)])
+        np.testing.assert_allclose(region.paired_iou(rects, rects), [1.0, 0.0])
+
+    def test_region_array_matches_region(self):
+        regions = [Region(0, 31, 10, 20), Region(-5, 8, 3, 50), Region(40, 40, 0, 0)]
+        for op in (lambda r: r.scale(1.5), lambda r: r.expand_to_ratio(1.0), lambda r: r.expand_to_ratio(0.5)):
+            region_array = RegionArray.from_regions(regions)
+            op(region_array)
+            expected = [r.clone() for r in regions]
+            for r in expected:
+                op(r)
+            self.assertEqual(region_array.rects.tolist(), [[r.left, r.right, r.top, r.bottom] for r in expected])
+
+    def test_region_array_clip(self):
+        region_array = RegionArray.from_regions([Region(-5, 8, 3, 50), Region(1, 2, 3, 4)])
+        clipped = region_array.clone()
+        clipped.clip(6, 40)
+        self.assertEqual(clipped.rects.tolist(), [[0, 6, 3, 40], [1, 2, 3, 4]])
+        self.assertEqual(region_array.is_in_bounds(6, 40).tolist(), [False, True])
+
+    def test_region_array_distance(self):
+        regions = [Region(0, 10, 0, 10), Region(30, 40, 40, 50)]
+        region_array = RegionArray.from_regions(regions)
+        distances = region_array.distance(region_array[1:])
+        self.assertEqual(distances.shape, (2, 1))
+        self.assertAlmostEqual(distances[0, 0], Region.distance(regions[0], regions[1]))
+        self.assertEqual(repr(region_array[0]), repr(regions[0]))
+
+    def test_lazy_calibration(self):
+        r = Region(0, 10, 0, 10)
+        r.x = 20
+        r.width = 6
+        self.assertEqual((r.left, r.right), (17, 23))
+        r.left = 15
+        self.assertEqual((r.x, r.width), (19, 8))
+
+        r.set_center_size(50.7, 40.2, 11, 4)
+        self.assertEqual((r.left, r.right, r.top, r.bottom), (45, 55, 38, 42))
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Region().extra = 1
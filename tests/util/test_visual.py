@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+<Description>
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from tools.util import visual
+from tools.util.region import Region
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TestVisual(TestCase):
+    def test_extract_regions(self):
+        image = np.arange(20 * 30 * 3, dtype=np.uint8).reshape(20, 30, 3)
+        inside, crossing = visual.extract_regions(image, [Region(5, 15, 2, 12), Region(-5, 5, 15, 25)])
+
+        # Inside the image, the crop is a view. Across the border, it is padded with black.
+        self.assertTrue(np.shares_memory(inside, image))
+        np.testing.assert_array_equal(inside, image[2:12, 5:15])
+        self.assertEqual(crossing.shape, (10, 10, 3))
+        np.testing.assert_array_equal(crossing[:5, 5:], image[15:20, 0:5])
+        self.assertEqual(crossing[5:].max(), 0)
+
+        copied = visual.extract_regions(image, np.array([[5, 15, 2, 12]]), copy=True)[0]
+        self.assertFalse(np.shares_memory(copied, image))
+
+    def test_extract_regions_outside(self):
+        # Boxes entirely off the frame, on every side, are all black.
+        image = np.full((100, 100, 3), 255, dtype=np.uint8)
+        regions = [Region(-30, -10, 0, 20), Region(110, 130, 0, 20), Region(0, 20, -40, -20), Region(0, 20, 120, 150)]
+        crops = visual.extract_regions(image, regions)
+        self.assertEqual([c.shape for c in crops], [(20, 20, 3), (20, 20, 3), (20, 20, 3), (30, 20, 3)])
+        self.assertFalse(any(c.any() for c in crops))
+
+    def test_extract_regions_resized(self):
+        image = np.full((20, 30, 3), 9, dtype=np.uint8)
+        out = np.zeros((2, 8, 4, 3), dtype=np.uint8)
+        result = visual.extract_regions(image, np.array([[0, 10, 0, 10], [25, 35, 0, 20]]), size=(4, 8), out=out)
+
+        self.assertIs(result, out)
+        self.assertTrue(np.all(out[0] == 9))
+        self.assertEqual(out[1, :, 0].min(), 9)  # Left half is inside the image.
+        self.assertEqual(out[1, :, -1].max(), 0)  # Right half is padding.
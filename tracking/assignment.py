@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""
+Assignment strategies: given a (tracklets x detections) cost matrix and a mask of the pairs that passed gating,
+decide which tracklet gets which detection.
+"""
+
+from abc import abstractmethod
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_linear_sum_assignment
+except ImportError:  # SciPy is optional, we fall back to the NumPy solver below.
+    _scipy_linear_sum_assignment = None
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class Assignment:
+
+    def assign(self, costs: np.ndarray, mask: np.ndarray) -> List[Tuple[int, int]]:
+        """ Return the matched (row, column) pairs. Each row and column is used at most once,
+        and only pairs inside the mask may be matched. """
+        rows, cols = np.nonzero(mask)
+        return self.assign_pairs(rows, cols, costs[rows, cols], costs.shape)
+
+    @abstractmethod
+    def assign_pairs(self, rows: np.ndarray, cols: np.ndarray, costs: np.ndarray,
+                     shape: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """ Same as assign, but the candidates are given as sparse (row, column, cost) triplets. """
+        pass
+
+
+class GreedyAssignment(Assignment):
+    """ Sort all the candidate pairs by cost, and take the first free ones. """
+
+    def assign_pairs(self, rows: np.ndarray, cols: np.ndarray, costs: np.ndarray,
+                     shape: Tuple[int, int]) -> List[Tuple[int, int]]:
+
+        # Ties are broken in row-major order, so the result does not depend on the order of the candidates.
+        order = np.lexsort((cols, rows, costs))
+
+        matches: List[Tuple[int, int]] = []
+        used_rows = set()
+        used_cols = set()
+        max_matches = min(shape)
+        for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+            if row not in used_rows and col not in used_cols:
+                used_rows.add(row)
+                used_cols.add(col)
+                matches.append((row, col))
+                if len(matches) == max_matches:
+                    break
+        return matches
+
+
+class LinearAssignment(Assignment):
+    """ Globally optimal assignment (minimum total cost) over the gated pairs.
+    The gating graph is split into its connected blocks first, so a sparse 500x500 scene is solved as
+    many small problems instead of one big dense one. """
+
+    def assign_pairs(self, rows: np.ndarray, cols: np.ndarray, costs: np.ndarray,
+                     shape: Tuple[int, int]) -> List[Tuple[int, int]]:
+        matches: List[Tuple[int, int]] = []
+        for pairs in get_blocks(rows, cols, shape):
+            block_rows, local_rows = np.unique(rows[pairs], return_inverse=True)
+            block_cols, local_cols = np.unique(cols[pairs], return_inverse=True)
+
+            # Trivial block, no need to run the solver.
+            if len(pairs) == 1:
+                matches.append((int(block_rows[0]), int(block_cols[0])))
+                continue
+
+            # Ungated pairs cost more than every gated pair combined, so the solver only uses them as a last resort.
+            block_costs = costs[pairs].astype(np.float64)
+            infeasible = np.abs(block_costs).sum() * 2 + 1
+            block_matrix = np.full((len(block_rows), len(block_cols)), infeasible)
+            block_mask = np.zeros(block_matrix.shape, dtype=bool)
+            block_matrix[local_rows, local_cols] = block_costs
+            block_mask[local_rows, local_cols] = True
+
+            for row, col in zip(*linear_sum_assignment(block_matrix)):
+                if block_mask[row, col]:
+                    matches.append((int(block_rows[row]), int(block_cols[col])))
+        return matches
+
+
+# ======================================================================================================================
+# Solver helpers.
+# ======================================================================================================================
+
+
+def get_blocks(rows: np.ndarray, cols: np.ndarray, shape: Tuple[int, int]) -> List[np.ndarray]:
+    """ Split the bipartite graph of candidate pairs into its connected components.
+    Returns the indices of the pairs belonging to each component. """
+    if len(rows) == 0:
+        return []
+
+    # Rows are nodes [0, n), columns are nodes [n, n + m). Propagate the smallest label along the edges.
+    n_rows = shape[0]
+    labels = np.arange(n_rows + shape[1])
+    col_nodes = cols + n_rows
+    while True:
+        edge_labels = np.minimum(labels[rows], labels[col_nodes])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, rows, edge_labels)
+        np.minimum.at(new_labels, col_nodes, edge_labels)
+
+        # Pointer jumping to shortcut long chains.
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    pair_labels = labels[rows]
+    order = np.argsort(pair_labels, kind="stable")
+    splits = np.flatnonzero(np.diff(pair_labels[order])) + 1
+    return np.split(order, splits)
+
+
+def linear_sum_assignment(costs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Solve the rectangular linear sum assignment problem. Uses SciPy if it is installed. """
+    if _scipy_linear_sum_assignment is not None:
+        return _scipy_linear_sum_assignment(costs)
+
+    if costs.shape[0] > costs.shape[1]:
+        cols, rows = _solve_hungarian(costs.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+    return _solve_hungarian(costs)
+
+
+def _solve_hungarian(costs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Shortest augmenting path Hungarian algorithm, O(n^2 m), with the inner loop vectorized.
+    Requires rows <= columns. Index 0 of the potentials is a dummy slot, as in the classic formulation. """
+    n, m = costs.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)  # Row matched to each column (1-based, 0 is free).
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        min_v = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+
+            reduced = costs[i0 - 1] - u[i0] - v[1:]
+            improved = np.zeros(m + 1, dtype=bool)
+            improved[1:] = reduced < min_v[1:]
+            improved &= free
+            min_v[improved] = reduced[improved[1:]]
+            way[improved] = j0
+
+            candidates = np.where(free, min_v, np.inf)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            min_v[free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        # Flip the augmenting path.
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(p[1:]) + 1
+    rows = p[cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order] - 1
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+AsyncTracker: an asyncio front-end for Trackers, so an ingestion service can feed detections without blocking the
+event loop. Each stream has its own queue and is processed on an executor, one frame at a time and in order.
+When a stream falls behind, the queue is bounded by dropping or coalescing frames.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from enum import Enum
+from typing import Callable, Deque, Dict, Hashable, List
+
+import numpy as np
+
+from tools.tracking.tracker import Tracker
+from tools.tracking.tracker_pool import StreamResult, process_submission
+from tools.tracking.tracking_region import TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class Overflow(Enum):
+    DROP_OLDEST = 1  # Skip the oldest waiting frame, keep the most recent ones.
+    COALESCE = 2  # Replace the newest waiting frame with the incoming one.
+
+
+class _PendingFrame:
+    def __init__(self, frame_index: int, regions: List[TrackingRegion], image: np.ndarray, future: asyncio.Future):
+        self.frame_index: int = frame_index
+        self.regions: List[TrackingRegion] = regions
+        self.image: np.ndarray = image
+        self.futures: List[asyncio.Future] = [future]
+
+
+class _Stream:
+    def __init__(self, tracker: Tracker):
+        self.tracker: Tracker = tracker
+        self.pending: Deque[_PendingFrame] = deque()
+        self.task: asyncio.Task = None  # The only user of the tracker, draining the pending frames in order.
+
+
+class AsyncTracker:
+
+    def __init__(self, tracker_factory: Callable[[], Tracker], executor: Executor = None,
+                 max_pending: int = 4, overflow: Overflow = Overflow.DROP_OLDEST):
+        """ The executor defaults to the event loop's default thread pool. The trackers live in this process, so a
+        thread pool is needed here. Use TrackerPool for process-level parallelism. """
+        self.tracker_factory: Callable[[], Tracker] = tracker_factory
+        self.executor: Executor = executor
+        self.max_pending: int = max(1, max_pending)
+        self.overflow: Overflow = overflow
+        self._streams: Dict[Hashable, _Stream] = {}
+
+    # ===================================================================================================
+    # Public interface.
+    # ===================================================================================================
+
+    def submit(self, stream_id: Hashable, frame_index: int, regions: List[TrackingRegion],
+               image: np.ndarray = None) -> asyncio.Future:
+        """ Queue a frame of detections. Returns a future for its StreamResult. If the frame gets skipped because
+        the stream is behind, the future resolves with the result of the frame that replaced it.
+        The image of the frame, if given, is used for the thumbnails (see Tracker.save_image) right after the frame
+        is processed, so the crops always come from the frame the regions belong to. """
+        loop = asyncio.get_running_loop()
+        stream = self._get_stream(stream_id)
+        future = loop.create_future()
+        frame = _PendingFrame(frame_index, regions, image, future)
+
+        if len(stream.pending) < self.max_pending:
+            stream.pending.append(frame)
+        elif self.overflow == Overflow.DROP_OLDEST:
+            dropped = stream.pending.popleft()
+            stream.pending.append(frame)
+            stream.pending[0].futures.extend(dropped.futures)
+        else:
+            newest = stream.pending[-1]
+            newest.frame_index = frame_index
+            newest.regions = regions
+            newest.image = image
+            newest.futures.append(future)
+
+        if stream.task is None:
+            stream.task = loop.create_task(self._drain(stream_id, stream))
+        return future
+
+    async def process(self, stream_id: Hashable, frame_index: int, regions: List[TrackingRegion],
+                      image: np.ndarray = None) -> StreamResult:
+        return await self.submit(stream_id, frame_index, regions, image)
+
+    async def remove(self, stream_id: Hashable) -> None:
+        """ Finish the waiting frames of a stream, then drop its tracker. """
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return
+        if stream.task is not None:
+            await stream.task
+        del self._streams[stream_id]
+
+    async def join(self) -> None:
+        """ Wait until every stream has processed all of its waiting frames. """
+        tasks = [s.task for s in self._streams.values() if s.task is not None]
+        if len(tasks) > 0:
+            await asyncio.gather(*tasks)
+
+    def get_pending_count(self, stream_id: Hashable) -> int:
+        stream = self._streams.get(stream_id)
+        return 0 if stream is None else len(stream.pending)
+
+    # ===================================================================================================
+    # Private functions.
+    # ===================================================================================================
+
+    def _get_stream(self, stream_id: Hashable) -> _Stream:
+        if stream_id not in self._streams:
+            self._streams[stream_id] = _Stream(self.tracker_factory())
+        return self._streams[stream_id]
+
+    async def _drain(self, stream_id: Hashable, stream: _Stream) -> None:
+        """ Process the waiting frames of one stream in order, until its queue is empty. """
+        loop = asyncio.get_running_loop()
+        try:
+            while len(stream.pending) > 0:
+                frame = stream.pending.popleft()
+                try:
+                    result = await loop.run_in_executor(self.executor, process_submission, stream.tracker, stream_id,
+                                                        frame.frame_index, frame.regions, frame.image)
+                except Exception as e:
+                    for future in frame.futures:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for future in frame.futures:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            stream.task = None
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+Throughput benchmark for trackers over synthetic scenes.
+Every tracker runs the same deterministic scenes, and reports frames per second, latency percentiles for each
+stage of a frame, and the peak memory allocated by Python. Run the default suite with:
+
+    python -m tools.tracking.benchmark
+"""
+
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from tools.tracking.assignment import LinearAssignment
+from tools.tracking.kalman_filter import KalmanFilter
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.synthetic_scene import SceneConfig, SceneFrame, generate_scene
+from tools.tracking.tracker import Tracker
+from tools.tracking.tracker_stats import TrackerStats
+from tools.tracking.tracklet_bank import TrackletBank
+from tools.util.logger import Logger
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+PERCENTILES = (50, 95, 99)
+
+DEFAULT_SCENES: Dict[str, SceneConfig] = OrderedDict([
+    ("sparse", SceneConfig(object_count=10)),
+    ("crowded", SceneConfig(object_count=200, max_size=60)),
+    ("occluded", SceneConfig(object_count=50, occlusion=0.05, dropout=0.15, clutter=5.0)),
+    ("fast", SceneConfig(object_count=50, max_speed=30.0, noise=0.1)),
+])
+
+DEFAULT_TRACKERS: Dict[str, Callable[[], Tracker]] = OrderedDict([
+    ("proximity", ProximityTracker),
+    ("proximity-linear", lambda: ProximityTracker(assignment=LinearAssignment())),
+    ("proximity-motion", lambda: ProximityTracker(motion=KalmanFilter())),
+    ("proximity-bank", lambda: ProximityTracker(bank=TrackletBank())),
+])
+
+
+class BenchmarkResult:
+    def __init__(self, tracker_name: str, scene_name: str, frame_count: int, duration: float,
+                 latencies: Dict[str, np.ndarray], peak_memory: int = None):
+        self.tracker_name: str = tracker_name
+        self.scene_name: str = scene_name
+        self.frame_count: int = frame_count
+        self.duration: float = duration  # Seconds, for every stage of every frame.
+        self.latencies: Dict[str, np.ndarray] = latencies  # Seconds, per stage and frame.
+        self.peak_memory: int = peak_memory  # Bytes, or None if not measured.
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frame_count / self.duration if self.duration > 0 else float("inf")
+
+    def get_percentiles(self, stage: str) -> Dict[int, float]:
+        """ Latency percentiles of the stage, in milliseconds. """
+        values = np.percentile(self.latencies[stage], PERCENTILES) * 1000
+        return dict(zip(PERCENTILES, values.tolist()))
+
+
+# ======================================================================================================================
+# Running.
+# ======================================================================================================================
+
+
+def run_benchmark(tracker_factory: Callable[[], Tracker], frames: List[SceneFrame], tracker_name: str = "",
+                  scene_name: str = "", measure_memory: bool = True, instrument: bool = False) -> BenchmarkResult:
+    """ Run a fresh tracker over the scene, and time each stage of every frame.
+    If instrumented, the tracker also reports the stages inside process (see TrackerStats), as "process/<stage>".
+    Memory is measured in a second pass, since tracing allocations slows everything down. """
+    stages = OrderedDict([("process", []), ("output", [])])
+    tracker = tracker_factory()
+    if instrument:
+        tracker.stats = TrackerStats(window=max(len(frames), 1))
+    inputs = _copy_detections(frames)
+
+    clock = time.perf_counter
+    start = clock()
+    for frame, detections in zip(frames, inputs):
+        t0 = clock()
+        tracker.process(detections, frame.frame_index)
+        t1 = clock()
+        tracker.get_live_regions()
+        tracker.get_lost_regions()
+        t2 = clock()
+        stages["process"].append(t1 - t0)
+        stages["output"].append(t2 - t1)
+    duration = clock() - start
+
+    latencies = OrderedDict((stage, np.array(values)) for stage, values in stages.items())
+    if instrument:
+        for i, stage in enumerate(TrackerStats.STAGES):
+            latencies["process/" + stage] = tracker.stats.get_durations(i)
+    peak_memory = _measure_memory(tracker_factory, frames) if measure_memory else None
+    return BenchmarkResult(tracker_name, scene_name, len(frames), duration, latencies, peak_memory)
+
+
+def run_suite(trackers: Dict[str, Callable[[], Tracker]] = None, scenes: Dict[str, SceneConfig] = None,
+              measure_memory: bool = True, instrument: bool = False) -> List[BenchmarkResult]:
+    """ Run every tracker over every scene. """
+    trackers = DEFAULT_TRACKERS if trackers is None else trackers
+    scenes = DEFAULT_SCENES if scenes is None else scenes
+
+    results: List[BenchmarkResult] = []
+    for scene_name, config in scenes.items():
+        frames = generate_scene(config)
+        for tracker_name, tracker_factory in trackers.items():
+            results.append(run_benchmark(tracker_factory, frames, tracker_name, scene_name, measure_memory,
+                                         instrument))
+    return results
+
+
+def log_results(results: List[BenchmarkResult]) -> None:
+    for result in results:
+        Logger.header("{} / {}".format(result.tracker_name, result.scene_name))
+        Logger.field("Frames per Second", "{:.1f}".format(result.frames_per_second))
+        for stage in result.latencies:
+            percentiles = result.get_percentiles(stage)
+            Logger.field("{} (ms)".format(stage.capitalize()),
+                         " ".join("p{}: {:.3f}".format(p, v) for p, v in percentiles.items()))
+        if result.peak_memory is not None:
+            Logger.field("Peak Memory", "{:.2f} MB".format(result.peak_memory / 1e6))
+
+
+def _measure_memory(tracker_factory: Callable[[], Tracker], frames: List[SceneFrame]) -> int:
+    inputs = _copy_detections(frames)
+    tracemalloc.start()
+    try:
+        tracker = tracker_factory()
+        for frame, detections in zip(frames, inputs):
+            tracker.process(detections, frame.frame_index)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _copy_detections(frames: List[SceneFrame]) -> list:
+    """ Trackers keep and modify the regions they get, so every run needs its own copies. """
+    return [[region.clone() for region in frame.detections] for frame in frames]
+
+
+if __name__ == "__main__":
+    log_results(run_suite())
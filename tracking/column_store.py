@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+The on-disk layout shared by the track exporter and the detection log: a directory of flat binary columns that are
+only ever appended to, and read back as memory-mapped arrays. Labels are stored as codes into a vocabulary file.
+
+    <path>/schema.json          The dtype and width of each column.
+    <path>/<column>.bin         The rows of one column.
+    <path>/labels.txt           One label per line. A label code is the line number, or -1 for no label.
+"""
+
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+# Column name: (dtype, width).
+Columns = Dict[str, Tuple[str, int]]
+
+SCHEMA_FILE = "schema.json"
+LABELS_FILE = "labels.txt"
+
+
+class LabelVocabulary:
+    """ The label codes of a store. New labels are appended to the labels file as soon as they are seen. """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self._codes: Dict[str, int] = {label: i for i, label in enumerate(read_labels(path))}
+
+    def get_code(self, label: str) -> int:
+        if label is None:
+            return -1
+        if label not in self._codes:
+            self._codes[label] = len(self._codes)
+            with open(os.path.join(self.path, LABELS_FILE), "a", encoding="utf-8") as f:
+                f.write(label + "\n")
+        return self._codes[label]
+
+
+def create(path: str, columns: Columns) -> None:
+    """ Make the store's directory if needed, and write its schema. """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, SCHEMA_FILE), "w") as f:
+        json.dump({"columns": columns}, f)
+
+
+def get_column_path(path: str, name: str) -> str:
+    return os.path.join(path, name + ".bin")
+
+
+def append_column(path: str, name: str, dtype: str, rows: List[np.ndarray]) -> None:
+    """ Append the chunks of rows to the end of a column. """
+    with open(get_column_path(path, name), "ab") as f:
+        f.write(np.concatenate(rows).astype(dtype, copy=False).tobytes())
+
+
+def map_column(path: str, name: str, columns: Columns) -> np.ndarray:
+    """ A read-only memory-mapped view of a column, with one row per entry (and width values in each row). """
+    dtype, width = columns[name]
+    shape = (-1, width) if width > 1 else (-1,)
+    column_path = get_column_path(path, name)
+
+    # A zero length file cannot be mapped.
+    if not os.path.exists(column_path) or os.path.getsize(column_path) == 0:
+        return np.empty(0, dtype=dtype).reshape(shape)
+    return np.memmap(column_path, dtype=dtype, mode="r").reshape(shape)
+
+
+def read_labels(path: str) -> List[str]:
+    labels_path = os.path.join(path, LABELS_FILE)
+    if not os.path.exists(labels_path):
+        return []
+    with open(labels_path, encoding="utf-8") as f:
+        return f.read().splitlines()
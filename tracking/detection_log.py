@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Detection log: a compact on-disk recording of the detections of every frame, for replaying into a tracker.
+Frames are appended as they come in, and the log opens as a DetectionSequence whose arrays are memory-mapped,
+so a multi-hour recording opens instantly and each frame is only read (and turned into regions) when it is used.
+
+    <path>/schema.json          The dtype and width of each column.
+    <path>/offsets.bin          The first row of each frame, plus one final entry for the end of the last frame.
+    <path>/<column>.bin         frame_indices has one row per frame, the others one row per detection.
+    <path>/labels.txt           One label per line. label_ids is the line number, or -1 for no label.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from tools.tracking import column_store
+from tools.tracking.column_store import LabelVocabulary
+from tools.tracking.detection_sequence import DetectionSequence
+from tools.tracking.tracking_region import TrackingRegion
+from tools.util.region import get_rects
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+# Column name: (dtype, width).
+COLUMNS = {
+    "offsets": ("int64", 1),
+    "frame_indices": ("int64", 1),
+    "rects": ("int32", 4),  # [left, right, top, bottom]
+    "confidences": ("float32", 1),
+    "label_ids": ("int32", 1),
+}
+
+
+class DetectionLogWriter:
+    """ Appends frames to a detection log, creating it if needed. Rows are buffered, and written out every
+    chunk_size detections (and on flush or close). """
+
+    def __init__(self, path: str, chunk_size: int = 65536):
+        self.path: str = path
+        self.chunk_size: int = chunk_size
+        self._rows: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS}
+        self._buffered: int = 0
+
+        column_store.create(path, COLUMNS)
+
+        offsets = column_store.map_column(path, "offsets", COLUMNS)
+        if len(offsets) == 0:
+            offsets = np.zeros(1, dtype=np.int64)
+            self._rows["offsets"].append(offsets)
+        self._row_count: int = int(offsets[-1])
+        self._labels: LabelVocabulary = LabelVocabulary(path)
+
+    def __enter__(self) -> 'DetectionLogWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, frame_index: int, regions: List[TrackingRegion]) -> None:
+        count = len(regions)
+        self._row_count += count
+        self._rows["offsets"].append(np.array([self._row_count], dtype=np.int64))
+        self._rows["frame_indices"].append(np.array([frame_index], dtype=np.int64))
+        self._rows["rects"].append(get_rects(regions))
+        self._rows["confidences"].append(np.fromiter((r.confidence for r in regions), dtype=np.float32,
+                                                     count=count))
+        self._rows["label_ids"].append(np.fromiter((self._labels.get_code(r.label) for r in regions), dtype=np.int32,
+                                                   count=count))
+
+        self._buffered += count + 1
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Append the buffered rows to the column files. The frame indices go last, since the reader takes the
+        frame count from them: a reader never sees a frame whose detections are not written yet. """
+        for name in ("offsets", "rects", "confidences", "label_ids", "frame_indices"):
+            if self._rows[name]:
+                column_store.append_column(self.path, name, COLUMNS[name][0], self._rows[name])
+            self._rows[name] = []
+        self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+
+
+def write_sequence(path: str, sequence: DetectionSequence) -> None:
+    """ Save a whole DetectionSequence as a new detection log. The ground truth is not saved. """
+    with DetectionLogWriter(path) as writer:
+        for i in range(len(sequence)):
+            writer.write(sequence.get_frame_index(i), sequence.get_regions(i))
+
+
+def open_log(path: str) -> DetectionSequence:
+    """ Open a detection log as a DetectionSequence of memory-mapped (read-only) arrays. """
+    arrays = {name: column_store.map_column(path, name, COLUMNS) for name in COLUMNS}
+    frame_count = len(arrays["frame_indices"])
+    if frame_count == 0:
+        arrays["offsets"] = np.zeros(1, dtype=np.int64)  # Nothing flushed yet.
+    else:
+        arrays["offsets"] = arrays["offsets"][:frame_count + 1]
+    return DetectionSequence(arrays, column_store.read_labels(path))
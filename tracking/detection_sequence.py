@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+DetectionSequence: a recorded sequence of detections (and optionally the ground truth), packed into flat arrays.
+Frame i owns the rows offsets[i]:offsets[i + 1] of every per-detection array, so the whole recording is a handful
+of contiguous buffers. These can live anywhere: in memory, in shared memory, or memory-mapped from disk.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from tools.tracking.synthetic_scene import SceneFrame
+from tools.tracking.tracking_region import TrackingRegion
+from tools.util.region import RegionArray, get_rects
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class DetectionSequence:
+
+    def __init__(self, arrays: Dict[str, np.ndarray], labels: List[str] = None):
+        """ The arrays are offsets, frame_indices, rects, confidences and label_ids, and for the ground truth,
+        gt_offsets, gt_ids and gt_rects. Label IDs index into the labels, or are -1 for no label. """
+        self.arrays: Dict[str, np.ndarray] = arrays
+        self.labels: List[str] = labels if labels is not None else []
+
+    def __len__(self) -> int:
+        return max(0, len(self.arrays["offsets"]) - 1)
+
+    @property
+    def has_ground_truth(self) -> bool:
+        return "gt_offsets" in self.arrays
+
+    def get_frame_index(self, i: int) -> int:
+        return int(self.arrays["frame_indices"][i])
+
+    def get_regions(self, i: int) -> List[TrackingRegion]:
+        """ Fresh TrackingRegions for the detections of frame i. """
+        start, end = self.arrays["offsets"][i:i + 2].tolist()
+        rects = self.arrays["rects"][start:end].tolist()
+        confidences = self.arrays["confidences"][start:end].tolist()
+        label_ids = self.arrays["label_ids"][start:end].tolist()
+
+        regions: List[TrackingRegion] = []
+        for (left, right, top, bottom), confidence, label_id in zip(rects, confidences, label_ids):
+            region = TrackingRegion(left, right, top, bottom)
+            region.confidence = confidence
+            region.label = self.labels[label_id] if label_id >= 0 else None
+            regions.append(region)
+        return regions
+
+    def get_region_array(self, i: int) -> RegionArray:
+        """ The boxes of frame i as a RegionArray, without building any region objects. """
+        start, end = self.arrays["offsets"][i:i + 2].tolist()
+        return RegionArray(self.arrays["rects"][start:end])
+
+    def iter_frames(self) -> Iterator[Tuple[int, List[TrackingRegion]]]:
+        """ Lazily yield the (frame index, regions) of each frame, ready to feed into Tracker.process. """
+        for i in range(len(self)):
+            yield self.get_frame_index(i), self.get_regions(i)
+
+    def get_ground_truth(self, i: int):
+        """ The (ids, rects) of the ground truth objects in frame i. """
+        start, end = self.arrays["gt_offsets"][i:i + 2].tolist()
+        return self.arrays["gt_ids"][start:end], self.arrays["gt_rects"][start:end]
+
+    # ===================================================================================================
+    # Construction.
+    # ===================================================================================================
+
+    @staticmethod
+    def from_regions(frames: List[List[TrackingRegion]], frame_indices: List[int] = None) -> 'DetectionSequence':
+        frame_indices = list(range(len(frames))) if frame_indices is None else frame_indices
+        regions = [r for frame in frames for r in frame]
+
+        labels: Dict[str, int] = OrderedDict()
+        label_ids = [-1 if r.label is None else labels.setdefault(r.label, len(labels)) for r in regions]
+
+        arrays = {
+            "offsets": _get_offsets([len(frame) for frame in frames]),
+            "frame_indices": np.array(frame_indices, dtype=np.int64),
+            "rects": get_rects(regions).astype(np.int32),
+            "confidences": np.array([r.confidence for r in regions], dtype=np.float32),
+            "label_ids": np.array(label_ids, dtype=np.int32),
+        }
+        return DetectionSequence(arrays, list(labels))
+
+    @staticmethod
+    def from_scene(frames: List[SceneFrame]) -> 'DetectionSequence':
+        """ Record a synthetic scene, with its ground truth. """
+        sequence = DetectionSequence.from_regions([f.detections for f in frames], [f.frame_index for f in frames])
+        sequence.arrays["gt_offsets"] = _get_offsets([len(f.object_ids) for f in frames])
+        sequence.arrays["gt_ids"] = np.concatenate([f.object_ids for f in frames]).astype(np.int64)
+        sequence.arrays["gt_rects"] = np.concatenate([f.rects for f in frames]).astype(np.int32).reshape(-1, 4)
+        return sequence
+
+
+def _get_offsets(counts: List[int]) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
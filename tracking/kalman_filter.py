@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+A constant velocity Kalman filter, run over a whole bank of tracks at once.
+Each track owns a slot in the bank, and predict/update work on many slots in a single batch of NumPy matrix ops.
+The state of each track is [x, y, width, height, vx, vy]: the center moves with a velocity, the size is a random walk.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class KalmanFilter:
+
+    # Noise, relative to the biggest edge of the box (so big boxes are allowed to move more).
+    STD_POSITION = 1.0 / 20
+    STD_VELOCITY = 1.0 / 160
+
+    _STATE_SIZE = 6
+    _MEASURE_SIZE = 4
+
+    def __init__(self, capacity: int = 64):
+        self._mean: np.ndarray = np.zeros((capacity, self._STATE_SIZE))
+        self._covariance: np.ndarray = np.zeros((capacity, self._STATE_SIZE, self._STATE_SIZE))
+        self._used: np.ndarray = np.zeros(capacity, dtype=bool)
+
+    def reset(self):
+        self._used[:] = False
+
+    @property
+    def count(self) -> int:
+        return int(self._used.sum())
+
+    # ===================================================================================================
+    # Slot management.
+    # ===================================================================================================
+
+    def add(self, boxes: np.ndarray) -> np.ndarray:
+        """ Start a new track for each (x, y, width, height) box. Returns the slot of each one. """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, self._MEASURE_SIZE)
+        slots = self._allocate(len(boxes))
+
+        edge = self._get_edge(boxes)
+        std = np.concatenate([np.repeat(2 * self.STD_POSITION * edge, 4, axis=1),
+                              np.repeat(10 * self.STD_VELOCITY * edge, 2, axis=1)], axis=1)
+
+        self._mean[slots] = 0
+        self._mean[slots, :4] = boxes
+        self._covariance[slots] = _diagonal(std ** 2)
+        self._used[slots] = True
+        return slots
+
+    def remove(self, slots: np.ndarray) -> None:
+        self._used[np.asarray(slots, dtype=np.int64)] = False
+
+    def _allocate(self, count: int) -> np.ndarray:
+        free = np.flatnonzero(~self._used)
+        if len(free) < count:
+            self._grow(len(self._used) - len(free) + count)
+            free = np.flatnonzero(~self._used)
+        return free[:count]
+
+    def _grow(self, required: int) -> None:
+        capacity = max(required, len(self._used) * 2)
+        extra = capacity - len(self._used)
+        self._mean = np.concatenate([self._mean, np.zeros((extra, self._STATE_SIZE))])
+        self._covariance = np.concatenate([self._covariance, np.zeros((extra, self._STATE_SIZE, self._STATE_SIZE))])
+        self._used = np.concatenate([self._used, np.zeros(extra, dtype=bool)])
+
+    # ===================================================================================================
+    # Batched filter steps.
+    # ===================================================================================================
+
+    def predict(self, slots: np.ndarray, steps: Union[int, np.ndarray] = 1) -> None:
+        """ Move the given tracks forward by a number of frames (a scalar, or one per slot). """
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+
+        steps = np.broadcast_to(np.asarray(steps, dtype=np.float64), slots.shape)
+        transition = np.tile(np.eye(self._STATE_SIZE), (len(slots), 1, 1))
+        transition[:, 0, 4] = steps
+        transition[:, 1, 5] = steps
+
+        mean = self._mean[slots]
+        edge = self._get_edge(mean[:, :4])
+        std = np.concatenate([np.repeat(self.STD_POSITION * edge, 4, axis=1),
+                              np.repeat(self.STD_VELOCITY * edge, 2, axis=1)], axis=1)
+        noise = _diagonal(std ** 2 * steps[:, np.newaxis])
+
+        self._mean[slots] = np.einsum("kij,kj->ki", transition, mean)
+        self._covariance[slots] = transition @ self._covariance[slots] @ transition.transpose(0, 2, 1) + noise
+
+    def update(self, slots: np.ndarray, boxes: np.ndarray) -> None:
+        """ Correct the given tracks with their matched (x, y, width, height) measurements. """
+        slots = np.asarray(slots, dtype=np.int64)
+        if len(slots) == 0:
+            return
+
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, self._MEASURE_SIZE)
+        mean = self._mean[slots]
+        covariance = self._covariance[slots]
+
+        # The measurement is the first four entries of the state, so H * P is just the top rows of P.
+        edge = self._get_edge(mean[:, :4])
+        noise = _diagonal(np.repeat((self.STD_POSITION * edge) ** 2, 4, axis=1))
+        projected = covariance[:, :4, :4] + noise
+        gain = np.linalg.solve(projected, covariance[:, :4, :]).transpose(0, 2, 1)
+        innovation = boxes - mean[:, :4]
+
+        self._mean[slots] = mean + np.einsum("kij,kj->ki", gain, innovation)
+        self._covariance[slots] = covariance - gain @ covariance[:, :4, :]
+
+    # ===================================================================================================
+    # Access.
+    # ===================================================================================================
+
+    def get_boxes(self, slots: np.ndarray) -> np.ndarray:
+        """ The current (x, y, width, height) estimate of each slot. """
+        return self._mean[np.asarray(slots, dtype=np.int64), :4].copy()
+
+    def get_velocities(self, slots: np.ndarray) -> np.ndarray:
+        """ The current (vx, vy) estimate of each slot, in pixels per frame. """
+        return self._mean[np.asarray(slots, dtype=np.int64), 4:].copy()
+
+    def get_state(self, slots: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ The (K, 6) means and (K, 6, 6) covariances of the slots, for serialization. """
+        slots = np.asarray(slots, dtype=np.int64)
+        return self._mean[slots].copy(), self._covariance[slots].copy()
+
+    def set_state(self, slots: np.ndarray, mean: np.ndarray, covariance: np.ndarray) -> None:
+        slots = np.asarray(slots, dtype=np.int64)
+        self._mean[slots] = mean
+        self._covariance[slots] = covariance
+
+    @staticmethod
+    def _get_edge(boxes: np.ndarray) -> np.ndarray:
+        return np.maximum(np.maximum(boxes[:, 2], boxes[:, 3]), 1.0)[:, np.newaxis]
+
+
+def _diagonal(values: np.ndarray) -> np.ndarray:
+    """ Turn a (K, N) array into a stack of (K, N, N) diagonal matrices. """
+    matrices = np.zeros(values.shape + (values.shape[-1],))
+    index = np.arange(values.shape[-1])
+    matrices[:, index, index] = values
+    return matrices
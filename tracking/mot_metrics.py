@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+"""
+Multiple object tracking accuracy: the CLEAR MOT metrics (MOTA, MOTP, ID switches, fragmentation) and the
+identity metrics (IDF1, IDP, IDR), for tracker outputs against ground truth.
+
+Boxes match when their IoU is at least the threshold. Each frame keeps the matches of the previous frames where it
+can, and assigns the rest optimally. The per frame work is a few small array ops, and everything that needs the
+whole sequence (fragmentation and the identity matching) is done once at the end, over the concatenated logs.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from tools.tracking.assignment import LinearAssignment, get_blocks, linear_sum_assignment
+from tools.tracking.tracker import Tracker
+from tools.util.region import get_rects, iou_matrix
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class MotMetrics:
+    def __init__(self, frame_count: int, gt_count: int, hypothesis_count: int, match_count: int, id_switches: int,
+                 fragmentations: int, overlap: float, id_true_positives: int):
+        self.frame_count: int = frame_count
+        self.gt_count: int = gt_count  # Ground truth boxes, over every frame.
+        self.hypothesis_count: int = hypothesis_count  # Tracker boxes, over every frame.
+        self.match_count: int = match_count
+        self.misses: int = gt_count - match_count
+        self.false_positives: int = hypothesis_count - match_count
+        self.id_switches: int = id_switches
+        self.fragmentations: int = fragmentations
+        self.id_true_positives: int = id_true_positives
+
+        self.mota: float = 1 - (self.misses + self.false_positives + id_switches) / max(gt_count, 1)
+        self.motp: float = overlap / match_count if match_count > 0 else 0.0  # Mean IoU of the matches.
+        self.idp: float = id_true_positives / max(hypothesis_count, 1)
+        self.idr: float = id_true_positives / max(gt_count, 1)
+        self.idf1: float = 2 * id_true_positives / max(gt_count + hypothesis_count, 1)
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(self.__dict__)
+
+
+class MotAccumulator:
+    """ Feed it the ground truth and the tracker output of each frame, in order, then compute the metrics. """
+
+    def __init__(self, iou_threshold: float = 0.5):
+        self.iou_threshold: float = iou_threshold
+        self.frame_count: int = 0
+        self._assignment: LinearAssignment = LinearAssignment()
+        self._last_match: Dict[int, int] = {}  # Ground truth ID: the hypothesis ID it was last matched to.
+
+        self._hypothesis_count: int = 0
+        self._match_count: int = 0
+        self._id_switches: int = 0
+        self._overlap: float = 0.0
+
+        # Logs for the whole sequence metrics.
+        self._gt_ids: List[np.ndarray] = []
+        self._gt_matched: List[np.ndarray] = []
+        self._pair_gt_ids: List[np.ndarray] = []
+        self._pair_hypothesis_ids: List[np.ndarray] = []
+
+    def update(self, gt_ids: np.ndarray, gt_rects: np.ndarray, hypothesis_ids: np.ndarray,
+               hypothesis_rects: np.ndarray) -> None:
+        """ Add one frame. The rects are (N, 4) arrays of [left, right, top, bottom]. """
+        gt_ids = np.asarray(gt_ids, dtype=np.int64)
+        hypothesis_ids = np.asarray(hypothesis_ids, dtype=np.int64)
+        gt_rects = np.asarray(gt_rects, dtype=np.float64).reshape(-1, 4)
+        hypothesis_rects = np.asarray(hypothesis_rects, dtype=np.float64).reshape(-1, 4)
+
+        iou = iou_matrix(gt_rects, hypothesis_rects)
+        valid = iou >= self.iou_threshold
+        rows, cols = self._match(gt_ids, hypothesis_ids, iou, valid)
+
+        # An ID switch is a ground truth object matched to something other than what it last was.
+        gt_list = gt_ids[rows].tolist()
+        hypothesis_list = hypothesis_ids[cols].tolist()
+        for gt_id, hypothesis_id in zip(gt_list, hypothesis_list):
+            if self._last_match.get(gt_id, hypothesis_id) != hypothesis_id:
+                self._id_switches += 1
+        self._last_match.update(zip(gt_list, hypothesis_list))
+
+        matched = np.zeros(len(gt_ids), dtype=bool)
+        matched[rows] = True
+        pair_rows, pair_cols = np.nonzero(valid)
+
+        self.frame_count += 1
+        self._hypothesis_count += len(hypothesis_ids)
+        self._match_count += len(rows)
+        self._overlap += float(iou[rows, cols].sum())
+        self._gt_ids.append(gt_ids)
+        self._gt_matched.append(matched)
+        self._pair_gt_ids.append(gt_ids[pair_rows])
+        self._pair_hypothesis_ids.append(hypothesis_ids[pair_cols])
+
+    def update_tracker(self, gt_ids: np.ndarray, gt_rects: np.ndarray, tracker: Tracker) -> None:
+        """ Add one frame, using the latest raw region of every live tracklet as the output. The hypothesis IDs are
+        the tracklet identities, so a re-identified object keeps its ID. """
+        tracklets = [t for t in tracker.active_tracklets if t.is_live]
+        hypothesis_ids = [t.identity for t in tracklets]
+        self.update(gt_ids, gt_rects, hypothesis_ids, get_rects([t.last_frame.raw_region for t in tracklets]))
+
+    def compute(self) -> MotMetrics:
+        gt_ids = np.concatenate(self._gt_ids) if self._gt_ids else np.zeros(0, dtype=np.int64)
+        gt_matched = np.concatenate(self._gt_matched) if self._gt_matched else np.zeros(0, dtype=bool)
+        return MotMetrics(self.frame_count, len(gt_ids), self._hypothesis_count, self._match_count,
+                          self._id_switches, _count_fragmentations(gt_ids, gt_matched), self._overlap,
+                          self._get_id_true_positives())
+
+    # ===================================================================================================
+    # Private Functions.
+    # ===================================================================================================
+
+    def _match(self, gt_ids: np.ndarray, hypothesis_ids: np.ndarray, iou: np.ndarray,
+               valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Keep the previous matches that are still valid, then assign the rest (as many as possible first,
+        then by the best IoU). Returns the matched rows and columns. """
+        columns = {hypothesis_id: i for i, hypothesis_id in enumerate(hypothesis_ids.tolist())}
+        previous = np.array([columns.get(self._last_match.get(gt_id), -1) for gt_id in gt_ids.tolist()],
+                            dtype=np.int64)
+        keep_rows = np.flatnonzero(previous >= 0)
+        keep_rows = keep_rows[valid[keep_rows, previous[keep_rows]]]
+        keep_cols = previous[keep_rows]
+
+        # Several objects may last have been matched to the same hypothesis. The best overlap keeps it, and the
+        # others are assigned along with the rest.
+        order = np.argsort(-iou[keep_rows, keep_cols], kind="stable")
+        _, first = np.unique(keep_cols[order], return_index=True)
+        keep_rows = keep_rows[order[first]]
+        keep_cols = keep_cols[order[first]]
+
+        free = valid.copy()
+        free[keep_rows, :] = False
+        free[:, keep_cols] = False
+        rows, cols = np.nonzero(free)
+        new = self._assignment.assign_pairs(rows, cols, 1 - iou[rows, cols], iou.shape)
+        new_rows, new_cols = np.array(new, dtype=np.int64).reshape(-1, 2).T
+        return np.concatenate([keep_rows, new_rows]), np.concatenate([keep_cols, new_cols])
+
+    def _get_id_true_positives(self) -> int:
+        """ Match whole ground truth trajectories to whole hypothesis trajectories (one to one), to maximize the
+        number of frames where they overlap. """
+        if not self._pair_gt_ids:
+            return 0
+
+        pair_gt_ids = np.concatenate(self._pair_gt_ids)
+        pair_hypothesis_ids = np.concatenate(self._pair_hypothesis_ids)
+        if len(pair_gt_ids) == 0:
+            return 0
+
+        _, rows = np.unique(pair_gt_ids, return_inverse=True)
+        _, cols = np.unique(pair_hypothesis_ids, return_inverse=True)
+        pairs, counts = np.unique(np.stack([rows, cols], axis=1), axis=0, return_counts=True)
+        rows, cols = pairs[:, 0], pairs[:, 1]
+
+        # Solve each block of trajectories that ever overlapped on its own. Pairs that never overlapped count
+        # as 0, the same as leaving both unmatched, so the solver is never forced into a worse match.
+        total = 0
+        for block in get_blocks(rows, cols, (int(rows.max()) + 1, int(cols.max()) + 1)):
+            block_rows, local_rows = np.unique(rows[block], return_inverse=True)
+            block_cols, local_cols = np.unique(cols[block], return_inverse=True)
+            gains = np.zeros((len(block_rows), len(block_cols)))
+            gains[local_rows, local_cols] = counts[block]
+            matched_rows, matched_cols = linear_sum_assignment(-gains)
+            total += int(gains[matched_rows, matched_cols].sum())
+        return total
+
+
+def evaluate(gt_frames: Iterable[Tuple[np.ndarray, np.ndarray]],
+             hypothesis_frames: Iterable[Tuple[np.ndarray, np.ndarray]], iou_threshold: float = 0.5) -> MotMetrics:
+    """ Compute the metrics over two sequences of (ids, rects) frames, one for the ground truth and one for the
+    tracker output. """
+    accumulator = MotAccumulator(iou_threshold)
+    for (gt_ids, gt_rects), (hypothesis_ids, hypothesis_rects) in zip(gt_frames, hypothesis_frames):
+        accumulator.update(gt_ids, gt_rects, hypothesis_ids, hypothesis_rects)
+    return accumulator.compute()
+
+
+def _count_fragmentations(gt_ids: np.ndarray, matched: np.ndarray) -> int:
+    """ Count the times a ground truth trajectory stops being tracked, and is picked up again later. """
+    if len(gt_ids) == 0:
+        return 0
+
+    # Group the log by object, keeping it in frame order.
+    order = np.argsort(gt_ids, kind="stable")
+    gt_ids = gt_ids[order]
+    matched = matched[order]
+    position = np.arange(len(gt_ids))
+
+    _, group = np.unique(gt_ids, return_inverse=True)
+    last_tracked = np.full(group.max() + 1, -1)
+    np.maximum.at(last_tracked, group[matched], position[matched])
+
+    same_object = gt_ids[1:] == gt_ids[:-1]
+    dropped = same_object & matched[:-1] & ~matched[1:]
+    return int((dropped & (position[1:] < last_tracked[group[1:]])).sum())
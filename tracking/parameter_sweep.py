@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parameter sweeps for tuning trackers. The recorded DetectionSequence is copied once into shared memory, every
+worker process maps it without copying, and each parameter combination runs a fresh tracker over the whole
+sequence. The throughput (and the MOT accuracy, if the sequence has ground truth) of every combination is collected
+into one results table.
+
+    results = sweep(sequence, {"reach": [1.0, 1.5, 2.0], "miss_limit": [5, 7, 10]})
+"""
+
+import csv
+import itertools
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from tools.tracking.detection_sequence import DetectionSequence
+from tools.tracking.mot_metrics import MotAccumulator
+from tools.tracking.proximity_tracker.proximity_tracker import ProximityTracker
+from tools.tracking.tracker import Tracker
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+# Name of each array: (dtype, shape, byte offset into the shared block).
+Layout = Dict[str, Tuple[str, Tuple[int, ...], int]]
+
+# State of a worker process, set once by _attach_worker.
+_worker_sequence: DetectionSequence = None
+_worker_memory: shared_memory.SharedMemory = None
+_worker_factory: Callable[[Dict], Tracker] = None
+
+
+def create_proximity_tracker(params: Dict) -> Tracker:
+    """ The default factory for sweeps: a ProximityTracker, with the parameters set on its TrackerConfig. """
+    tracker = ProximityTracker()
+    for name, value in params.items():
+        if not hasattr(tracker.config, name):
+            raise ValueError("Unknown tracker parameter: {}".format(name))
+        setattr(tracker.config, name, value)
+    return tracker
+
+
+def sweep(sequence: DetectionSequence, grid: Dict[str, List],
+          tracker_factory: Callable[[Dict], Tracker] = create_proximity_tracker, workers: int = None) -> List[Dict]:
+    """ Run every combination of the parameter grid over the sequence. Returns one row per combination, with the
+    parameters, frames_per_second, and the MOT metrics if the sequence has ground truth.
+    The factory builds a tracker from a dict of parameters, and must be picklable (a module level function).
+    Workers defaults to the number of cores. With 0 workers, everything runs in this process. """
+    names = list(grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    workers = multiprocessing.cpu_count() if workers is None else workers
+
+    if len(combinations) == 0:
+        return []
+    if workers == 0:
+        return [run_configuration(sequence, tracker_factory, params) for params in combinations]
+
+    memory, layout = share_arrays(sequence.arrays)
+    try:
+        with multiprocessing.Pool(min(workers, len(combinations)), initializer=_attach_worker,
+                                  initargs=(memory.name, layout, sequence.labels, tracker_factory)) as pool:
+            return pool.map(_run_worker_configuration, combinations, chunksize=1)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def run_configuration(sequence: DetectionSequence, tracker_factory: Callable[[Dict], Tracker],
+                      params: Dict) -> Dict:
+    """ Run one tracker over the whole sequence. Only the tracker itself is timed. """
+    tracker = tracker_factory(params)
+    accumulator = MotAccumulator() if sequence.has_ground_truth else None
+
+    duration = 0.0
+    for i in range(len(sequence)):
+        regions = sequence.get_regions(i)
+        start = time.perf_counter()
+        tracker.process(regions, sequence.get_frame_index(i))
+        duration += time.perf_counter() - start
+
+        if accumulator is not None:
+            accumulator.update_tracker(*sequence.get_ground_truth(i), tracker)
+
+    row = dict(params)
+    row["frames_per_second"] = len(sequence) / duration if duration > 0 else float("inf")
+    if accumulator is not None:
+        metrics = accumulator.compute()
+        for name in ("mota", "motp", "idf1", "id_switches", "fragmentations", "misses", "false_positives"):
+            row[name] = getattr(metrics, name)
+    return row
+
+
+def save_results(results: List[Dict], path: str) -> None:
+    """ Write the results table to a CSV file. """
+    columns = list(results[0]) if results else []
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+# ======================================================================================================================
+# Shared memory.
+# ======================================================================================================================
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, Layout]:
+    """ Copy the arrays into a single new shared memory block. The caller owns the block, and must unlink it. """
+    layout: Layout = {}
+    size = 0
+    for name, array in arrays.items():
+        size = -(-size // 8) * 8  # Keep every array aligned.
+        layout[name] = (array.dtype.str, array.shape, size)
+        size += array.nbytes
+
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, array in map_arrays(memory, layout).items():
+        array[...] = arrays[name]
+    return memory, layout
+
+
+def map_arrays(memory: shared_memory.SharedMemory, layout: Layout) -> Dict[str, np.ndarray]:
+    """ Views of the arrays inside a shared memory block, without copying. """
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf, offset=offset)
+            for name, (dtype, shape, offset) in layout.items()}
+
+
+def _attach_worker(name: str, layout: Layout, labels: List[str], tracker_factory: Callable[[Dict], Tracker]):
+    global _worker_sequence, _worker_memory, _worker_factory
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_sequence = DetectionSequence(map_arrays(_worker_memory, layout), labels)
+    _worker_factory = tracker_factory
+
+
+def _run_worker_configuration(params: Dict) -> Dict:
+    return run_configuration(_worker_sequence, _worker_factory, params)
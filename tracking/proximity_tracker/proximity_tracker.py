@@ -4,74 +4,250 @@
 This is an example extension of the base tracking class, how to use it.
 """
 
-from typing import List
-
-from tools.tracking.tracker import Tracker
+from enum import Enum
+from typing import List, Tuple
+
+import numpy as np
+
+from tools.tracking.assignment import Assignment
+from tools.tracking.kalman_filter import KalmanFilter
+from tools.tracking.reid_gallery import ReidGallery
+from tools.tracking.track_export import TrackExporter
+from tools.tracking.spatial_grid import SpatialGrid
+from tools.tracking.tracker import RetentionPolicy, Tracker
+from tools.tracking.tracker_config import TrackerConfig
+from tools.tracking.tracker_stats import TrackerStats
 from tools.tracking.tracking_region import TrackingRegion
 from tools.tracking.track_frame import TrackFrame
 from tools.tracking.tracklet import Tracklet
-from tools.util.region import Region
+from tools.tracking.tracklet_bank import TrackletBank
+from tools.util import region
 
 __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
 
 
-class TrackletPair:
-    def __init__(self, tracklet: Tracklet, new_frame: TrackFrame, distance: float):
-        self.tracklet: Tracklet = tracklet
-        self.new_frame: TrackFrame = new_frame
-        self.distance: float = distance
+class CostMode(Enum):
+    DISTANCE = 1  # Euclidean distance between centers, gated by REACH.
+    IOU = 2  # 1 - IoU, gated by MIN_IOU.
+    GIOU = 3  # 1 - GIoU, gated by REACH.
 
 
 class ProximityTracker(Tracker):
 
+    # Defaults for the config.
     REACH = 1.5
-
-    def __init__(self):
-        super().__init__()
+    MIN_IOU = 0.1
+
+    # Above this many (tracklet x detection) combinations, gate through a spatial grid instead of all-pairs.
+    GRID_MIN_PAIRS = 4096
+
+    def __init__(self, *, assignment: Assignment = None, cost_mode: CostMode = CostMode.DISTANCE,
+                 history_size: int = None, retention: RetentionPolicy = None, motion: KalmanFilter = None,
+                 bank: TrackletBank = None, exporter: TrackExporter = None, config: TrackerConfig = None,
+                 reid: ReidGallery = None, stats: TrackerStats = None):
+        """ The config replaces the tracker's defaults entirely. To change only some settings, start from
+        default_config. """
+        config = config if config is not None else self.default_config()
+        super().__init__(assignment=assignment, history_size=history_size, retention=retention, motion=motion,
+                         bank=bank, exporter=exporter, config=config, reid=reid, stats=stats)
+        self.cost_mode: CostMode = cost_mode
+
+    @classmethod
+    def default_config(cls, **overrides) -> TrackerConfig:
+        """ The config this tracker uses by default, with any of its settings overridden, e.g.
+        ProximityTracker.default_config(hit_limit=1). """
+        settings = dict(reach=cls.REACH, min_iou=cls.MIN_IOU, ratio_lock=1.0, scale_factor=1.5,
+                        color=(255, 150, 30), red_fade=True)
+        settings.update(overrides)
+        return TrackerConfig(**settings)
 
     def process(self, regions: List[TrackingRegion], frame_index: int = 0):
-        new_frames = self._convert_to_track_frames(regions, frame_index, ratio_lock=1.0, scale_factor=1.5)
-
-        # Compare each detection to each other, and make a list of them.
-        tracklet_pairs: List[TrackletPair] = []
-        for tracklet in self.active_tracklets:
-
-            if tracklet.is_lost:
-                continue
-
-            old_t = tracklet.track_frames[-1]
-            for new_t in new_frames:
-                distance = Region.distance(new_t.raw_region, old_t.raw_region)
-                reach = new_t.raw_region.biggest_edge * self.REACH
-                if distance < reach:
-                    t_pair: TrackletPair = TrackletPair(tracklet, new_t, distance)
-                    tracklet_pairs.append(t_pair)
-
-        # For each valid pair, merge them.
-        tracklet_pairs.sort(key=lambda x: x.distance)
+        stats = self.stats
+        if stats is not None:
+            stats.start()
+
+        elapsed = self._step_frame(frame_index)
+        config = self.config
+        new_frames = self._convert_to_track_frames(regions, frame_index, config.ratio_lock, config.scale_factor,
+                                                   config.display, config.headless)
+        if stats is not None:
+            stats.lap(TrackerStats.CONVERT)
+
+        # Match the tracklets to the detections, and merge them.
+        tracklets = [t for t in self.active_tracklets if not t.is_lost]
         merged = {}
-
-        for pair in tracklet_pairs:
-            if pair.new_frame not in merged and pair.tracklet not in merged:
-                merged[pair.new_frame] = True
-                merged[pair.tracklet] = True
-                pair.tracklet.add(pair.new_frame)
-
-        # TODO: This loop is probably not efficient.
-        # Decay the non-hit tracklets.
-        for tracklet in self.active_tracklets:
-            if tracklet not in merged:
-                tracklet.update(hit=False)
-
-        # Add all the un-merged detections.
-        for frame in new_frames:
-            if frame not in merged:
-                tracklet: Tracklet = Tracklet(color=(255, 150, 30), red_fade=True)
-                tracklet.add(frame)
-                self.active_tracklets.append(tracklet)
-                self.all_tracklets.append(tracklet)
+        matched: List[Tracklet] = []
+        for t_index, f_index in self._associate(tracklets, new_frames, elapsed):
+            tracklet = tracklets[t_index]
+            new_frame = new_frames[f_index]
+            merged[new_frame] = True
+            merged[tracklet] = True
+            tracklet.add(new_frame, register_hit=False)
+            matched.append(tracklet)
+
+        if self.motion is not None:
+            self._update_motion(matched)
+
+        # Register the hits on the merged tracklets, and decay the others.
+        self._register_hits(self.active_tracklets, [t in merged for t in self.active_tracklets], elapsed)
+
+        # Add all the un-merged detections. Low confidence ones may only extend existing tracklets.
+        unmerged = [frame for frame in new_frames if frame not in merged]
+        if config.high_confidence is not None:
+            unmerged = [frame for frame in unmerged if frame.raw_region.confidence >= config.high_confidence]
+        new_tracklets = self._create_tracklets(len(unmerged))
+        for tracklet, frame in zip(new_tracklets, unmerged):
+            tracklet.add(frame, register_hit=False)
+        self._register_hits(new_tracklets, [True] * len(new_tracklets))
+
+        if self.motion is not None:
+            self._start_motion(new_tracklets)
+        self.active_tracklets.extend(new_tracklets)
+        self.all_tracklets.extend(new_tracklets)
+        if stats is not None:
+            stats.lap(TrackerStats.UPDATE)
 
         # Prune the list of all the tracks.
         self.remove_dead_tracklets()
-
+        if stats is not None:
+            stats.lap(TrackerStats.PRUNING)
+            stats.finish(len(self.active_tracklets))
+
+    # ===================================================================================================
+    # Association.
+    # ===================================================================================================
+
+    def _associate(self, tracklets: List[Tracklet], new_frames: List[TrackFrame],
+                   steps: int = 1) -> List[Tuple[int, int]]:
+        """ Pick the (tracklet index, frame index) pairs to merge. The detections are matched in confidence tiers
+        (the high ones first, then the rest against the tracklets still unmatched), and if the tracker is class aware,
+        each label is matched on its own. Without either, this is one assignment over everything. """
+        old_centers, old_rects = self._get_tracklet_boxes(tracklets, steps)
+        new_centers = self._get_centers(new_frames)
+        new_edges = np.array([f.raw_region.biggest_edge for f in new_frames], dtype=np.float64)
+        new_rects = self._get_rects(new_frames) if self.cost_mode != CostMode.DISTANCE else None
+
+        stats = self.stats
+        matches: List[Tuple[int, int]] = []
+        unmatched = np.ones(len(tracklets), dtype=bool)
+        for tier in self._get_tiers(new_frames):
+            partitions = self._get_partitions(tracklets, new_frames, np.flatnonzero(unmatched), tier)
+            for old_indices, new_indices in partitions:
+                rows, cols, costs = self._get_candidates(
+                    old_centers[old_indices], old_rects[old_indices], new_centers[new_indices],
+                    new_edges[new_indices], new_rects[new_indices] if new_rects is not None else None)
+                if stats is not None:
+                    stats.add_pairs(len(rows))
+                    stats.lap(TrackerStats.GATING)
+
+                shape = (len(old_indices), len(new_indices))
+                for row, col in self.assignment.assign_pairs(rows, cols, costs, shape):
+                    matches.append((int(old_indices[row]), int(new_indices[col])))
+                    unmatched[old_indices[row]] = False
+                if stats is not None:
+                    stats.lap(TrackerStats.MATCHING)
+
+        if stats is not None:
+            stats.lap(TrackerStats.GATING)  # Whatever is left, e.g. the setup when there was nothing to match.
+        return matches
+
+    def _get_tiers(self, new_frames: List[TrackFrame]) -> List[np.ndarray]:
+        """ The indices of the detections to match in each pass, in order. """
+        if self.config.high_confidence is None:
+            return [np.arange(len(new_frames))]
+
+        confidences = np.array([f.raw_region.confidence for f in new_frames], dtype=np.float64)
+        high = confidences >= self.config.high_confidence
+        return [np.flatnonzero(high), np.flatnonzero(~high)]
+
+    def _get_partitions(self, tracklets: List[Tracklet], new_frames: List[TrackFrame], old_indices: np.ndarray,
+                        new_indices: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """ Split the tracklets and detections into the groups that may be matched with each other: one group per
+        label if the tracker is class aware, otherwise just one. """
+        if not self.config.class_aware:
+            return [(old_indices, new_indices)]
+
+        groups = {}
+        for i in old_indices.tolist():
+            groups.setdefault(tracklets[i].last_frame.raw_region.label, ([], []))[0].append(i)
+        for i in new_indices.tolist():
+            groups.setdefault(new_frames[i].raw_region.label, ([], []))[1].append(i)
+        return [(np.array(old, dtype=np.int64), np.array(new, dtype=np.int64))
+                for old, new in groups.values() if old and new]
+
+    # ===================================================================================================
+    # Batched gating.
+    # ===================================================================================================
+
+    def _get_candidates(self, old_centers: np.ndarray, old_rects: np.ndarray, new_centers: np.ndarray,
+                        new_edges: np.ndarray, new_rects: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Find the (tracklet index, frame index, cost) of every pair that passes the gate. The new rects are
+        only needed (and only given) for the overlap cost modes. """
+        reach = new_edges * self.config.reach
+
+        if self.cost_mode == CostMode.IOU:
+            # Overlapping boxes are never further apart than the sum of their biggest edges.
+            old_edges = np.maximum(old_rects[:, 1] - old_rects[:, 0], old_rects[:, 3] - old_rects[:, 2])
+            max_old_edge = old_edges.max() if len(old_edges) > 0 else 0
+            rows, cols = self._get_nearby_pairs(old_centers, new_centers, new_edges + max_old_edge)
+            overlaps = region.paired_iou(old_rects[rows], new_rects[cols])
+            passed = overlaps > self.config.min_iou
+            return rows[passed], cols[passed], 1.0 - overlaps[passed]
+
+        rows, cols = self._get_nearby_pairs(old_centers, new_centers, reach)
+        dx = old_centers[rows, 0] - new_centers[cols, 0]
+        dy = old_centers[rows, 1] - new_centers[cols, 1]
+        distances = np.sqrt(dx * dx + dy * dy)
+        passed = distances < reach[cols]
+        rows, cols, distances = rows[passed], cols[passed], distances[passed]
+
+        if self.cost_mode == CostMode.GIOU:
+            overlaps = region.paired_iou(old_rects[rows], new_rects[cols], generalized=True)
+            return rows, cols, 1.0 - overlaps
+        return rows, cols, distances
+
+    def _get_nearby_pairs(self, old_centers: np.ndarray, new_centers: np.ndarray,
+                          radii: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Candidate (old, new) index pairs. Small scenes use all-pairs, large ones only compare the pairs in
+        neighbouring cells of a spatial grid. The result may include pairs further apart than the radius. """
+        if len(old_centers) * len(new_centers) <= self.GRID_MIN_PAIRS:
+            rows, cols = np.indices((len(old_centers), len(new_centers)))
+            return rows.ravel(), cols.ravel()
+
+        grid = SpatialGrid(old_centers, cell_size=np.median(radii))
+        return grid.query_pairs(new_centers, radii)
+
+    def _get_tracklet_boxes(self, tracklets: List[Tracklet], steps: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """ The (N, 2) centers and (N, 4) rects to gate the tracklets with. If there is a motion model, these are
+        its boxes predicted the given steps forward. Otherwise they are the last raw regions, and if the config counts
+        frame gaps, they are moved along their last velocity up to the current frame. """
+        if self.motion is None:
+            old_frames = [t.last_frame for t in tracklets]
+            centers, rects = self._get_centers(old_frames), self._get_rects(old_frames)
+            if self.config.frame_gaps and len(tracklets) > 0:
+                gaps = np.array([self.frame_index - f.frame for f in old_frames], dtype=np.float64)
+                shifts = self._get_velocities(tracklets) * gaps[:, np.newaxis]
+                centers += shifts
+                rects = rects + np.repeat(shifts, 2, axis=1)
+            return centers, rects
+
+        boxes = self._predict_motion(tracklets, steps)
+        half_width = boxes[:, 2] / 2
+        half_height = boxes[:, 3] / 2
+        rects = np.stack([boxes[:, 0] - half_width, boxes[:, 0] + half_width,
+                          boxes[:, 1] - half_height, boxes[:, 1] + half_height], axis=1)
+        return boxes[:, :2], rects
+
+    @staticmethod
+    def _get_rects(track_frames: List[TrackFrame]) -> np.ndarray:
+        return region.get_rects([f.raw_region for f in track_frames])
+
+    @staticmethod
+    def _get_centers(track_frames: List[TrackFrame]) -> np.ndarray:
+        """ Pack the raw region centers of the frames into an (N, 2) array. """
+        centers = np.empty((len(track_frames), 2), dtype=np.float64)
+        for i, track_frame in enumerate(track_frames):
+            centers[i, 0] = track_frame.raw_region.x
+            centers[i, 1] = track_frame.raw_region.y
+        return centers
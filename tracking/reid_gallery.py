@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+Re-identification: remember what lost tracklets looked like, so an object that comes back gets its old identity
+instead of a new one. Each tracklet is described by a small color histogram of its thumbnail. The gallery keeps the
+most recently lost ones (up to a capacity), and new tracklets are matched against all of them in one matrix product.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from tools.tracking.assignment import Assignment, GreedyAssignment
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class ReidGallery:
+
+    # Thumbnails are sampled down to about this many pixels along each edge before the histogram.
+    SAMPLE_EDGE = 32
+
+    def __init__(self, capacity: int = 256, bins: int = 8, max_distance: float = 0.25, assignment: Assignment = None):
+        self.capacity: int = capacity
+        self.bins: int = bins  # Histogram bins per color channel.
+        self.max_distance: float = max_distance  # Hellinger distance (0 to 1) for a match.
+        self.assignment: Assignment = assignment if assignment is not None else GreedyAssignment()
+
+        # Identity: (slot, extra info such as the color). Ordered from the least to the most recently added.
+        self._entries: Dict[int, Tuple[int, object]] = OrderedDict()
+        self._identities: np.ndarray = np.full(capacity, -1, dtype=np.int64)
+        self._descriptors: np.ndarray = np.zeros((capacity, 3 * bins))  # Square roots of the histograms.
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset(self):
+        self._entries.clear()
+        self._identities[:] = -1
+
+    def add(self, identities: List[int], images: List[np.ndarray], infos: List = None) -> None:
+        """ Remember each identity by its image. The least recently added ones are dropped past the capacity. """
+        infos = infos if infos is not None else [None] * len(identities)
+        descriptors = get_descriptors(images, self.bins, self.SAMPLE_EDGE)
+        for identity, descriptor, info in zip(identities, descriptors, infos):
+            if identity in self._entries:
+                slot = self._entries.pop(identity)[0]
+            elif len(self._entries) < self.capacity:
+                slot = int(np.flatnonzero(self._identities < 0)[0])
+            else:
+                slot = self._entries.pop(next(iter(self._entries)))[0]
+
+            self._entries[identity] = (slot, info)
+            self._identities[slot] = identity
+            self._descriptors[slot] = np.sqrt(descriptor)
+
+    def match(self, images: List[np.ndarray]) -> List[Tuple[int, int, object]]:
+        """ Match each image to at most one remembered identity, and forget the matched ones.
+        Returns (image index, identity, info) for every match. """
+        if len(self._entries) == 0 or len(images) == 0:
+            return []
+
+        slots = np.flatnonzero(self._identities >= 0)
+        queries = np.sqrt(get_descriptors(images, self.bins, self.SAMPLE_EDGE))
+
+        # Hellinger distance between histograms: sqrt(1 - sum(sqrt(p * q))).
+        similarity = np.clip(queries @ self._descriptors[slots].T, 0.0, 1.0)
+        distances = np.sqrt(1.0 - similarity)
+        rows, cols = np.nonzero(distances < self.max_distance)
+
+        matches = []
+        for row, col in self.assignment.assign_pairs(rows, cols, distances[rows, cols], distances.shape):
+            slot = int(slots[col])
+            identity = int(self._identities[slot])
+            matches.append((row, identity, self._entries.pop(identity)[1]))
+            self._identities[slot] = -1
+        return matches
+
+
+def get_descriptors(images: List[np.ndarray], bins: int = 8, sample_edge: int = 32) -> np.ndarray:
+    """ L1 normalized color histograms (bins per channel, channels concatenated) of a batch of images, as an
+    (N, 3 * bins) array. Every image is sampled down by striding, and all of them are binned with one bincount.
+    Single channel images count their one channel as all three, and an alpha channel is ignored. """
+    width = 3 * bins
+    indices = []
+    for i, image in enumerate(images):
+        step_y = max(1, image.shape[0] // sample_edge)
+        step_x = max(1, image.shape[1] // sample_edge)
+        sample = image[::step_y, ::step_x]
+        channels = sample.shape[2] if sample.ndim == 3 else 1
+        pixels = sample.reshape(-1, channels)[:, :3]
+        if pixels.shape[1] < 3:
+            pixels = np.repeat(pixels[:, :1], 3, axis=1)
+        pixels = pixels.astype(np.int64) * bins // 256
+        indices.append((pixels + np.arange(3) * bins + i * width).ravel())
+
+    counts = np.bincount(np.concatenate(indices), minlength=len(images) * width) if indices else np.zeros(0)
+    histograms = counts.reshape(len(images), width).astype(np.float64)
+    return histograms / np.maximum(histograms.sum(axis=1, keepdims=True), 1)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+A uniform spatial hash over a set of 2D points. Instead of comparing every query against every point,
+each query only looks at the points in its neighbouring cells.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class SpatialGrid:
+
+    # Queries that reach further than this many cells are compared against every point instead, so one huge radius
+    # does not blow up the neighbour loop for the whole batch.
+    MAX_SPAN = 4
+
+    def __init__(self, points: np.ndarray, cell_size: float):
+        """ Bucket the (N, 2) points into square cells of the given size. """
+        self.cell_size: float = max(1.0, float(cell_size))
+        self.points: np.ndarray = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+
+        cells = np.floor(self.points / self.cell_size).astype(np.int64)
+        if len(cells) > 0:
+            self._origin = cells.min(axis=0)
+            self._shape = cells.max(axis=0) - self._origin + 1
+        else:
+            self._origin = np.zeros(2, dtype=np.int64)
+            self._shape = np.zeros(2, dtype=np.int64)
+
+        # Sort the points by cell key, so each cell is a contiguous slice of the order.
+        self._cells: np.ndarray = cells - self._origin
+        keys = self._get_keys(self._cells)
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def query_pairs(self, queries: np.ndarray, radii: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Find the candidate (point index, query index) pairs whose cells are within reach.
+        This is a superset of the pairs closer than the radius, the caller should still gate exactly. """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        radii = np.asarray(radii, dtype=np.float64).reshape(-1)
+
+        if len(self.points) == 0 or len(queries) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        point_indices = []
+        query_indices = []
+        cells = np.floor(queries / self.cell_size).astype(np.int64) - self._origin
+        spans = np.ceil(radii / self.cell_size).astype(np.int64)
+
+        far = spans > self.MAX_SPAN
+        if far.any():
+            points, owners = self._query_all(cells[far], spans[far])
+            point_indices.append(points)
+            query_indices.append(np.flatnonzero(far)[owners])
+            spans = np.where(far, -1, spans)  # Leave them out of the neighbour loop.
+
+        max_span = int(spans.max())
+        for dx in range(-max_span, max_span + 1):
+            for dy in range(-max_span, max_span + 1):
+                selected = np.flatnonzero(spans >= max(abs(dx), abs(dy)))
+                cx = cells[selected, 0] + dx
+                cy = cells[selected, 1] + dy
+                inside = (cx >= 0) & (cx < self._shape[0]) & (cy >= 0) & (cy < self._shape[1])
+                if not inside.any():
+                    continue
+
+                selected = selected[inside]
+                keys = self._get_keys(np.stack([cx[inside], cy[inside]], axis=1))
+                starts = np.searchsorted(self._sorted_keys, keys, side="left")
+                counts = np.searchsorted(self._sorted_keys, keys, side="right") - starts
+
+                points, owners = _expand_ranges(starts, counts, selected)
+                point_indices.append(self._order[points])
+                query_indices.append(owners)
+
+        if len(point_indices) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(point_indices), np.concatenate(query_indices)
+
+    def _query_all(self, cells: np.ndarray, spans: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ The (point index, query index) pairs within each query's span of cells, by comparing with every point.
+        The queries go in chunks, to keep the comparison matrix small. """
+        chunk = max(1, (1 << 20) // max(len(self._cells), 1))
+        points, owners = [], []
+        for start in range(0, len(cells), chunk):
+            offsets = np.abs(self._cells[np.newaxis, :, :] - cells[start:start + chunk, np.newaxis, :]).max(axis=2)
+            chunk_owners, chunk_points = np.nonzero(offsets <= spans[start:start + chunk, np.newaxis])
+            points.append(chunk_points)
+            owners.append(chunk_owners + start)
+        return np.concatenate(points), np.concatenate(owners)
+
+    def _get_keys(self, cells: np.ndarray) -> np.ndarray:
+        return cells[:, 0] * self._shape[1] + cells[:, 1]
+
+
+def _expand_ranges(starts: np.ndarray, counts: np.ndarray, owners: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Turn a list of [start, start + count) ranges into a flat array of positions, and who owns each one. """
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets, np.repeat(owners, counts)
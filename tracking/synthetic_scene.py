@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""
+Deterministic synthetic scenes for testing and benchmarking trackers: boxes that move at a constant velocity and
+bounce off the edges of the frame, with detection noise, dropped detections, occlusions and false positives.
+The same config (and seed) always generates the same scene, and the ground truth comes along with it.
+"""
+
+from typing import List
+
+import numpy as np
+
+from tools.tracking.tracking_region import TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class SceneConfig:
+    def __init__(self, object_count: int = 20, frame_count: int = 300, width: int = 1920, height: int = 1080,
+                 min_size: int = 20, max_size: int = 120, max_speed: float = 8.0, noise: float = 0.05,
+                 dropout: float = 0.05, occlusion: float = 0.01, occlusion_length: int = 10, clutter: float = 1.0,
+                 seed: int = 0):
+        self.object_count: int = object_count
+        self.frame_count: int = frame_count
+        self.width: int = width
+        self.height: int = height
+        self.min_size: int = min_size
+        self.max_size: int = max_size
+        self.max_speed: float = max_speed  # Pixels per frame, along each axis.
+        self.noise: float = noise  # Std of the detection jitter, relative to the size of the box.
+        self.dropout: float = dropout  # Chance of missing each detection.
+        self.occlusion: float = occlusion  # Chance, per object and frame, of starting an occlusion.
+        self.occlusion_length: int = occlusion_length  # Max frames an occlusion lasts.
+        self.clutter: float = clutter  # Mean number of false positives per frame.
+        self.seed: int = seed
+
+
+class SceneFrame:
+    def __init__(self, frame_index: int, detections: List[TrackingRegion], object_ids: np.ndarray,
+                 rects: np.ndarray):
+        self.frame_index: int = frame_index
+        self.detections: List[TrackingRegion] = detections  # Shuffled, with the false positives mixed in.
+        self.object_ids: np.ndarray = object_ids  # The ground truth: every object in the frame, even if occluded.
+        self.rects: np.ndarray = rects  # (N, 4) true [left, right, top, bottom] of each object.
+
+
+def generate_scene(config: SceneConfig) -> List[SceneFrame]:
+    """ Generate every frame of the scene. Each detection of a real object has its ID in data["object_id"]. """
+    random = np.random.RandomState(config.seed)
+    count = config.object_count
+
+    size = random.uniform(config.min_size, config.max_size, (count, 2))
+    bounds = np.array([config.width, config.height], dtype=np.float64)
+    position = random.uniform(0, 1, (count, 2)) * (bounds - size) + size / 2
+    velocity = random.uniform(-config.max_speed, config.max_speed, (count, 2))
+    occluded = np.zeros(count, dtype=np.int64)  # Frames of occlusion left.
+
+    frames: List[SceneFrame] = []
+    for frame_index in range(config.frame_count):
+        position += velocity
+
+        # Bounce off the edges.
+        low, high = size / 2, bounds - size / 2
+        bounced = (position < low) | (position > high)
+        velocity[bounced] *= -1
+        position = np.clip(position, low, high)
+
+        occluded = np.maximum(occluded - 1, 0)
+        starts = random.uniform(0, 1, count) < config.occlusion
+        occluded[starts] = random.randint(1, config.occlusion_length + 1, int(starts.sum()))
+
+        # Noisy detections of the visible objects.
+        visible = (occluded == 0) & (random.uniform(0, 1, count) >= config.dropout)
+        jitter = random.normal(0, config.noise, (count, 4)) * np.concatenate([size, size], axis=1)
+        centers = position + jitter[:, :2]
+        sizes = np.maximum(size + jitter[:, 2:], 2)
+
+        detections: List[TrackingRegion] = []
+        for i in np.flatnonzero(visible).tolist():
+            region = _create_region(centers[i], sizes[i])
+            region.data["object_id"] = i
+            detections.append(region)
+
+        # False positives.
+        for _ in range(random.poisson(config.clutter)):
+            clutter_size = random.uniform(config.min_size, config.max_size, 2)
+            detections.append(_create_region(random.uniform(0, 1, 2) * bounds, clutter_size))
+
+        order = random.permutation(len(detections))
+        rects = np.concatenate([position - size / 2, position + size / 2], axis=1)[:, [0, 2, 1, 3]]
+        frames.append(SceneFrame(frame_index, [detections[i] for i in order],
+                                 np.arange(count), rects.round().astype(np.int64)))
+
+    return frames
+
+
+def _create_region(center: np.ndarray, size: np.ndarray) -> TrackingRegion:
+    left, top = (center - size / 2).round().astype(int).tolist()
+    right, bottom = (center + size / 2).round().astype(int).tolist()
+    region = TrackingRegion(left, right, top, bottom)
+    region.confidence = 1.0
+    return region
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stream finished tracklets to disk in a columnar layout (see column_store), and read them back as memory-mapped arrays.
+Each column is a flat binary file that only ever gets appended to, so a writer can keep going for days and a reader
+can map millions of track frames without loading or parsing them. Labels are stored as codes into a vocabulary file.
+
+    <path>/schema.json          The dtype and width of each column.
+    <path>/<column>.bin         One row per track frame, in the order the tracklets were written.
+    <path>/labels.txt           One label per line. The label column is the line number, or -1 for no label.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from tools.tracking import column_store
+from tools.tracking.column_store import LabelVocabulary
+from tools.tracking.tracklet import Tracklet
+from tools.util.region import get_rects
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+# Column name: (dtype, width).
+COLUMNS = {
+    "tracklet_id": ("int64", 1),  # Sequential, in the order the tracklets were written.
+    "identity": ("int64", 1),  # Tracklet.identity, shared by a re-identified object's tracklets. -1 for none.
+    "frame": ("int64", 1),
+    "raw_rect": ("int32", 4),  # [left, right, top, bottom]
+    "display_rect": ("int32", 4),  # The raw rect for lazy (headless) frames whose display region was never made.
+    "confidence": ("float32", 1),
+    "label": ("int32", 1),
+}
+
+
+class TrackExporter:
+    """ Appends tracklets to a track store. Rows are buffered, and written out every chunk_size track frames.
+    Give it to a Tracker to export every tracklet as it is removed. Tracklets that are still active at the end of a
+    stream are not finished, so write those yourself if they are needed. """
+
+    def __init__(self, path: str, chunk_size: int = 65536):
+        self.path: str = path
+        self.chunk_size: int = chunk_size
+        self.tracklet_count: int = 0
+        self._rows: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS}
+        self._buffered: int = 0
+
+        column_store.create(path, COLUMNS)
+
+        # Carry on from an existing store.
+        self._labels: LabelVocabulary = LabelVocabulary(path)
+        tracklet_ids = column_store.map_column(path, "tracklet_id", COLUMNS)
+        if len(tracklet_ids) > 0:
+            self.tracklet_count = int(tracklet_ids[-1]) + 1
+
+    def __enter__(self) -> 'TrackExporter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, tracklets: List[Tracklet]) -> None:
+        """ Add the frames still kept in the history of each tracklet. Each one gets the next tracklet ID. """
+        for tracklet in tracklets:
+            frames = tracklet.track_frames
+            count = len(frames)
+            raw = [f.raw_region for f in frames]
+
+            self._rows["tracklet_id"].append(np.full(count, self.tracklet_count, dtype=np.int64))
+            identity = tracklet.identity if tracklet.identity is not None else -1
+            self._rows["identity"].append(np.full(count, identity, dtype=np.int64))
+            self._rows["frame"].append(np.fromiter((f.frame for f in frames), dtype=np.int64, count=count))
+            self._rows["raw_rect"].append(get_rects(raw))
+            self._rows["display_rect"].append(get_rects([f.display_region if f.has_display_region or not f.lazy
+                                                         else f.raw_region for f in frames]))
+            self._rows["confidence"].append(np.fromiter((r.confidence for r in raw), dtype=np.float32, count=count))
+            self._rows["label"].append(np.fromiter((self._labels.get_code(r.label) for r in raw),
+                                                   dtype=np.int32, count=count))
+            self.tracklet_count += 1
+            self._buffered += count
+
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Append the buffered rows to the column files. """
+        if self._buffered == 0:
+            return
+
+        for name, (dtype, _) in COLUMNS.items():
+            column_store.append_column(self.path, name, dtype, self._rows[name])
+            self._rows[name] = []
+        self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+
+
+class TrackReader:
+    """ Memory-mapped, read-only view of a track store. The columns are NumPy arrays with one row per track frame,
+    and the rows of each tracklet are contiguous and sorted by tracklet ID. """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.labels: List[str] = column_store.read_labels(path)
+        self.columns: Dict[str, np.ndarray] = {name: column_store.map_column(path, name, COLUMNS) for name in COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.columns["tracklet_id"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def tracklet_count(self) -> int:
+        tracklet_ids = self.columns["tracklet_id"]
+        return int(tracklet_ids[-1]) + 1 if len(tracklet_ids) > 0 else 0
+
+    def get_rows(self, tracklet_id: int) -> slice:
+        """ The rows that belong to this tracklet. """
+        tracklet_ids = self.columns["tracklet_id"]
+        return slice(int(np.searchsorted(tracklet_ids, tracklet_id, side="left")),
+                     int(np.searchsorted(tracklet_ids, tracklet_id, side="right")))
+
+    def get_labels(self, rows=slice(None)) -> List[str]:
+        """ Decode the label column, None for rows without a label. """
+        return [self.labels[code] if code >= 0 else None for code in self.columns["label"][rows].tolist()]
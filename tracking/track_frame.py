@@ -12,13 +12,16 @@ __email__ = "juangbhanich.k@gmail.com"
 
 
 class TrackFrame:
-    def __init__(self, region: TrackingRegion=None, ratio_lock: float=0.0, scale_factor: float=1.0):
+    def __init__(self, region: TrackingRegion=None, ratio_lock: float=0.0, scale_factor: float=1.0,
+                 display: bool=True, lazy: bool=False):
         # Basic tracking parameters.
         self.scale_factor = scale_factor
         self.ratio_lock = ratio_lock
+        self.display = display  # Without display, the display region is the raw region itself.
+        self.lazy = lazy  # Only make the display region when it is first used.
         self.frame = 0
         self.raw_region: TrackingRegion = None
-        self.display_region: TrackingRegion = None
+        self._display_region: TrackingRegion = None
 
         if region is not None:
             self.set_region(region)
@@ -26,10 +29,38 @@ class TrackFrame:
     def set_region(self, region: TrackingRegion):
         if region is not None:
             self.raw_region = region
-            self.display_region = region.clone()
-            if self.ratio_lock != 0:
-                self.display_region.expand_to_ratio(self.ratio_lock)
-            self.display_region.scale(self.scale_factor)
+            self._display_region = None
+            if not self.lazy:
+                self._display_region = self._create_display_region()
+
+    @property
+    def display_region(self) -> TrackingRegion:
+        if self._display_region is None and self.raw_region is not None:
+            self._display_region = self._create_display_region()
+        return self._display_region
+
+    @property
+    def has_display_region(self) -> bool:
+        """ If the display region is made yet. Lazy frames only make it when it is first read. """
+        return self._display_region is not None
+
+    @display_region.setter
+    def display_region(self, region: TrackingRegion):
+        self._display_region = region
+
+    def _create_display_region(self) -> TrackingRegion:
+        if not self.display:
+            return self.raw_region
+
+        display_region = self.raw_region.clone()
+        if self.ratio_lock != 0:
+            display_region.expand_to_ratio(self.ratio_lock)
+        display_region.scale(self.scale_factor)
+        return display_region
+
+    def set_center_size(self, x, y, width, height):
+        """ Set the display position and size together, with a single calibration. """
+        self.display_region.set_center_size(int(x), int(y), int(width), int(height))
 
     @property
     def x(self):
@@ -5,10 +5,19 @@ This is a universal, generic tracker system that generates tracks for an arbitra
 """
 
 from abc import abstractmethod
-from typing import List
+from itertools import compress
+from typing import Callable, List, Set, Tuple
+from tools.tracking.assignment import Assignment, GreedyAssignment
+from tools.tracking import tracker_snapshot
+from tools.tracking.kalman_filter import KalmanFilter
+from tools.tracking.reid_gallery import ReidGallery
+from tools.tracking.track_export import TrackExporter
+from tools.tracking.tracker_config import TrackerConfig
+from tools.tracking.tracker_stats import TrackerStats
 from tools.tracking.tracking_region import TrackingRegion
 from tools.tracking.track_frame import TrackFrame
 from tools.tracking.tracklet import Tracklet
+from tools.tracking.tracklet_bank import TrackletBank
 import numpy as np
 
 from tools.util import visual
@@ -17,28 +26,128 @@ __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
 
 
+class RetentionPolicy:
+    """ Decides how long finished tracklets are kept in Tracker.all_tracklets. Tracklets that are still active are
+    never retired. Retired tracklets are handed to on_retire (e.g. to spill them to disk) and then dropped. """
+
+    def __init__(self, max_count: int = None, max_age: int = None, on_retire: Callable[[Tracklet], None] = None):
+        self.max_count: int = max_count  # Max size of all_tracklets. The oldest finished tracklets go first.
+        self.max_age: int = max_age  # Max frames since the last frame of a finished tracklet.
+        self.on_retire: Callable[[Tracklet], None] = on_retire
+
+
 class Tracker:
 
-    def __init__(self):
+    def __init__(self, *, assignment: Assignment = None, history_size: int = None,
+                 retention: RetentionPolicy = None, motion: KalmanFilter = None, bank: TrackletBank = None,
+                 exporter: TrackExporter = None, config: TrackerConfig = None, reid: ReidGallery = None,
+                 stats: TrackerStats = None):
+        self.assignment: Assignment = assignment if assignment is not None else GreedyAssignment()
+        self.history_size: int = history_size  # Max frames kept per tracklet, None for all.
+        self.retention: RetentionPolicy = retention
+        self.motion: KalmanFilter = motion  # Optional motion model, to predict where the tracklets are going.
+        self.bank: TrackletBank = bank  # Optional backend to keep the tracklet states in parallel arrays.
+        self.exporter: TrackExporter = exporter  # Optional sink that gets every tracklet as it is removed.
+        self.config: TrackerConfig = config if config is not None else TrackerConfig()
+        self.reid: ReidGallery = reid  # Optional gallery to give returning objects their old identity.
+        self.stats: TrackerStats = stats  # Optional per-stage instrumentation of process.
+        self.frame_index: int = 0
+        self.identity_count: int = 0
         self.active_tracklets: List[Tracklet] = []
         self.all_tracklets: List[Tracklet] = []
+        self._remembered: Set[Tracklet] = set()  # Lost tracklets already in the re-identification gallery.
 
     def reset(self):
+        self.frame_index = 0
+        self.identity_count = 0
+        if self.motion is not None:
+            self.motion.reset()
+        if self.bank is not None:
+            self.bank.reset()
+        if self.reid is not None:
+            self.reid.reset()
+        if self.stats is not None:
+            self.stats.reset()
         self.active_tracklets = []
         self.all_tracklets = []
+        self._remembered = set()
+
+    def snapshot(self, full_history: bool = False) -> bytes:
+        """ Save the state of the active tracklets into a compact binary blob (see tracker_snapshot). By default only
+        the last frames that tracking needs to carry on are saved, not the whole history. """
+        return tracker_snapshot.dump(self, full_history)
+
+    def restore(self, data: bytes) -> None:
+        """ Replace the state of this tracker with a blob from snapshot. """
+        tracker_snapshot.load(self, data)
 
     @abstractmethod
     def process(self, regions: List[TrackingRegion], frame_index: int = 0):
         pass
 
     def save_image(self, frame: np.array):
-        for tracklet in self.active_tracklets:
-            if tracklet.is_recent and tracklet.image is None and tracklet.is_live:
-                tracklet.image = visual.safe_extract_with_region(frame, tracklet.display_region)
+        """ Crop a thumbnail for each newly live tracklet. With a re-identification gallery, this is also where
+        the new tracklets are matched against the ones that were lost. """
+        new_tracklets = [t for t in self.active_tracklets if t.is_recent and t.image is None and t.is_live]
+        crops = visual.extract_regions(frame, [t.display_region for t in new_tracklets], copy=True)
+        for tracklet, crop in zip(new_tracklets, crops):
+            tracklet.image = crop
+
+        if self.reid is not None:
+            self._reidentify(new_tracklets)
+
+    def _reidentify(self, new_tracklets: List[Tracklet]) -> None:
+        """ Remember the newly lost tracklets, then give each new tracklet that looks like one of them its identity
+        (and color). """
+        lost = [t for t in self.active_tracklets
+                if t.is_lost and t.is_activated and t.image is not None and t not in self._remembered]
+        self.reid.add([t.identity for t in lost], [t.image for t in lost], [t.color for t in lost])
+        self._remembered.update(lost)
+
+        for index, identity, color in self.reid.match([t.image for t in new_tracklets]):
+            new_tracklets[index].identity = identity
+            new_tracklets[index].color = color
 
     def remove_dead_tracklets(self) -> None:
         """ Get rid of the tracklets that we don't need anymore. """
-        self.active_tracklets = [t for t in self.active_tracklets if not t.is_lost or t.is_displayable]
+        if self.bank is not None:
+            keep = self.bank.is_kept(self.bank.get_slots(self.active_tracklets)).tolist()
+        else:
+            keep = [not t.is_lost or t.is_displayable for t in self.active_tracklets]
+
+        if self.motion is not None:
+            self.motion.remove([t.motion_slot for t, k in zip(self.active_tracklets, keep) if not k])
+        if self.exporter is not None:
+            self.exporter.write([t for t, k in zip(self.active_tracklets, keep) if not k])
+        if self._remembered:
+            self._remembered.difference_update(t for t, k in zip(self.active_tracklets, keep) if not k)
+
+        self.active_tracklets = list(compress(self.active_tracklets, keep))
+        if self.retention is not None:
+            self._retire_tracklets()
+
+    def _retire_tracklets(self) -> None:
+        """ Apply the retention policy to the finished tracklets, oldest first. """
+        policy = self.retention
+        active = set(self.active_tracklets)
+        excess = len(self.all_tracklets) - policy.max_count if policy.max_count is not None else 0
+
+        kept: List[Tracklet] = []
+        retired: List[Tracklet] = []
+        for tracklet in self.all_tracklets:
+            if tracklet not in active:
+                too_old = policy.max_age is not None and self.frame_index - tracklet.last_frame.frame > policy.max_age
+                if too_old or excess > 0:
+                    excess -= 1
+                    if policy.on_retire is not None:
+                        policy.on_retire(tracklet)
+                    retired.append(tracklet)
+                    continue
+            kept.append(tracklet)
+
+        self.all_tracklets = kept
+        if self.bank is not None:
+            self.bank.free(self.bank.get_slots(retired))
 
     def get_live_tracklets(self) -> List[Tracklet]:
         return self.active_tracklets
@@ -52,14 +161,111 @@ class Tracker:
     def get_raw_regions(self) -> List[TrackingRegion]:
         return [t.raw_region for t in self.active_tracklets if t.is_recent]
 
+    def predict_regions(self, frame_index: int) -> List[TrackingRegion]:
+        """ The live display regions, moved forward to a later frame (e.g. one that was skipped by the detector).
+        This does not change the state of the tracker. """
+        tracklets = [t for t in self.active_tracklets if t.is_live]
+        steps = np.array([frame_index - t.last_frame.frame for t in tracklets], dtype=np.float64)
+        shifts = self._get_velocities(tracklets) * steps[:, np.newaxis]
+
+        regions: List[TrackingRegion] = []
+        for tracklet, (dx, dy) in zip(tracklets, shifts.tolist()):
+            region = tracklet.display_region
+            region.x += dx
+            region.y += dy
+            regions.append(region)
+        return regions
+
+    def _step_frame(self, frame_index: int) -> int:
+        """ Move on to the frame, and return how many frames it counts for: the gap since the last one if the
+        config counts in frames, otherwise always 1. """
+        elapsed = frame_index - self.frame_index if self.config.frame_gaps else 1
+        self.frame_index = frame_index
+        return max(1, elapsed)
+
+    # ===================================================================================================
+    # Tracklet bookkeeping, either one by one or batched in the bank.
+    # ===================================================================================================
+
+    def _create_tracklets(self, count: int, color: Tuple = None, red_fade: bool = None) -> List[Tracklet]:
+        """ Create new tracklets from the config. The color and red fade default to the config too. """
+        config = self.config
+        settings = dict(hit_limit=config.hit_limit, miss_limit=config.miss_limit,
+                        color=config.color if color is None else color,
+                        red_fade=config.red_fade if red_fade is None else red_fade,
+                        history_size=self.history_size, config=config)
+        if self.bank is not None:
+            tracklets = self.bank.create(count, **settings)
+        else:
+            tracklets = [Tracklet(**settings) for _ in range(count)]
+
+        for tracklet in tracklets:
+            tracklet.identity = self.identity_count
+            self.identity_count += 1
+        return tracklets
+
+    def _register_hits(self, tracklets: List[Tracklet], hits: List[bool], frames: int = 1) -> None:
+        """ Register a hit or a miss for each of the tracklets, counting for a number of frames. """
+        if self.bank is not None:
+            self.bank.register(self.bank.get_slots(tracklets), hits, frames)
+            return
+
+        for tracklet, hit in zip(tracklets, hits):
+            tracklet.update(hit, frames)
+
     @staticmethod
-    def _convert_to_track_frames(regions: List[TrackingRegion], frame_index: int = 0,
-                                 ratio_lock: float=0.0, scale_factor: float=1.0) -> List[TrackFrame]:
+    def _convert_to_track_frames(regions: List[TrackingRegion], frame_index: int = 0, ratio_lock: float=0.0,
+                                 scale_factor: float=1.0, display: bool=True, lazy: bool=False) -> List[TrackFrame]:
         """ Convert from TrackingRegions to a list of Tracklets. """
         track_frames: List[TrackFrame] = []
         for region in regions:
-            track_frame: TrackFrame = TrackFrame(region, ratio_lock=ratio_lock, scale_factor=scale_factor)
+            track_frame: TrackFrame = TrackFrame(region, ratio_lock=ratio_lock, scale_factor=scale_factor,
+                                                 display=display, lazy=lazy)
             track_frame.frame = frame_index
             track_frames.append(track_frame)
         return track_frames
 
+    # ===================================================================================================
+    # Motion model.
+    # ===================================================================================================
+
+    def _start_motion(self, tracklets: List[Tracklet]) -> None:
+        """ Give each new tracklet a slot in the motion model, starting from its last frame. """
+        slots = self.motion.add(self._get_motion_boxes(tracklets))
+        for tracklet, slot in zip(tracklets, slots.tolist()):
+            tracklet.motion_slot = slot
+
+    def _predict_motion(self, tracklets: List[Tracklet], steps: int = 1) -> np.ndarray:
+        """ Step the motion model forward some frames, and return the predicted (x, y, width, height) boxes. """
+        slots = [t.motion_slot for t in tracklets]
+        self.motion.predict(slots, steps)
+        return self.motion.get_boxes(slots)
+
+    def _update_motion(self, tracklets: List[Tracklet]) -> None:
+        """ Correct the motion model with the latest frame of each (just matched) tracklet. """
+        self.motion.update([t.motion_slot for t in tracklets], self._get_motion_boxes(tracklets))
+
+    def _get_velocities(self, tracklets: List[Tracklet]) -> np.ndarray:
+        """ The (N, 2) center velocities of the tracklets, in pixels per frame. These come from the motion model if
+        there is one, otherwise from the last two frames of each tracklet. """
+        if self.motion is not None:
+            return self.motion.get_velocities([t.motion_slot for t in tracklets]).reshape(-1, 2)
+
+        velocities = np.zeros((len(tracklets), 2), dtype=np.float64)
+        for i, tracklet in enumerate(tracklets):
+            if len(tracklet.track_frames) < 2:
+                continue
+            previous, last = tracklet.track_frames[-2], tracklet.track_frames[-1]
+            gap = last.frame - previous.frame
+            if gap > 0:
+                velocities[i, 0] = (last.raw_region.x - previous.raw_region.x) / gap
+                velocities[i, 1] = (last.raw_region.y - previous.raw_region.y) / gap
+        return velocities
+
+    @staticmethod
+    def _get_motion_boxes(tracklets: List[Tracklet]) -> np.ndarray:
+        boxes = np.empty((len(tracklets), 4), dtype=np.float64)
+        for i, tracklet in enumerate(tracklets):
+            r = tracklet.last_frame.raw_region
+            boxes[i] = (r.x, r.y, r.width, r.height)
+        return boxes
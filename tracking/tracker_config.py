@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+TrackerConfig: the tunable settings of a Tracker, and of the Tracklets and TrackFrames it creates.
+Turning off the optional stages (smoothing, display regions) skips their work entirely, for low power nodes that
+only need the raw tracks. Headless mode keeps the display regions, but only makes them for the frames that are
+actually read, and leaves out the animation colors.
+"""
+
+from typing import Tuple
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TrackerConfig:
+    def __init__(self, hit_limit: int = 3, miss_limit: int = 7, reach: float = 1.5, min_iou: float = 0.1,
+                 class_aware: bool = False, high_confidence: float = None, frame_gaps: bool = False,
+                 ratio_lock: float = 0.0, scale_factor: float = 1.0, smoothing: bool = True,
+                 position_smoothing: float = 0.5, size_smoothing: float = 0.5, display: bool = True,
+                 headless: bool = False, color: Tuple = (255, 255, 255), red_fade: bool = False):
+
+        # Tracklet life cycle.
+        self.hit_limit: int = hit_limit  # Consecutive hits to activate a tracklet.
+        self.miss_limit: int = miss_limit  # Consecutive misses to lose it.
+
+        # For detections that only run every few frames: count the hits and misses in frames (from the gaps between
+        # the frame indices) rather than in calls to process, and extrapolate the tracklets across each gap.
+        self.frame_gaps: bool = frame_gaps
+
+        # Matching.
+        self.reach: float = reach  # Max center distance, relative to the biggest edge of the detection.
+        self.min_iou: float = min_iou
+        self.class_aware: bool = class_aware  # Only match detections to tracklets with the same label.
+
+        # Detections below this confidence are matched in a second pass, only against the tracklets left unmatched
+        # by the confident ones, and never start new tracklets. None matches everything in one pass.
+        self.high_confidence: float = high_confidence
+
+        # Display regions: expanded to the ratio (0 to keep the detection's own) and scaled.
+        self.display: bool = display  # If False, the display region is just the raw region.
+        self.headless: bool = headless  # Make display regions only when read, unsmoothed and without animation.
+        self.ratio_lock: float = ratio_lock
+        self.scale_factor: float = scale_factor
+
+        # Smoothing of the display region (so it does nothing without one). The factors are the weight of each
+        # new value.
+        self.smoothing: bool = smoothing
+        self.position_smoothing: float = position_smoothing
+        self.size_smoothing: float = size_smoothing
+
+        # Visuals.
+        self.color: Tuple = color
+        self.red_fade: bool = red_fade  # Fade lost tracklets out with the red animation.
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+TrackerPool: host many independent Trackers (one per stream, e.g. per camera) and shard them across worker processes.
+Each stream always lives on the same worker, so its frames are processed in order.
+"""
+
+import multiprocessing
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from tools.tracking.tracker import Tracker
+from tools.tracking.tracking_region import TrackingRegion
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+# A submission for one frame of one stream: (stream_id, frame_index, regions).
+Submission = Tuple[Hashable, int, List[TrackingRegion]]
+
+
+class StreamResult:
+    def __init__(self, stream_id: Hashable, frame_index: int,
+                 live_regions: List[TrackingRegion], lost_regions: List[TrackingRegion]):
+        self.stream_id: Hashable = stream_id
+        self.frame_index: int = frame_index
+        self.live_regions: List[TrackingRegion] = live_regions
+        self.lost_regions: List[TrackingRegion] = lost_regions
+
+
+class TrackerPool:
+
+    def __init__(self, tracker_factory: Callable[[], Tracker], workers: int = None):
+        """ The factory creates the Tracker for each new stream, and must be picklable (e.g. a Tracker class).
+        Workers defaults to the number of cores. With 0 workers, everything runs in this process. """
+        self.tracker_factory: Callable[[], Tracker] = tracker_factory
+        self.workers: int = multiprocessing.cpu_count() if workers is None else workers
+        self._trackers: Dict[Hashable, Tracker] = {}  # Only used when there are no workers.
+        self._connections = []
+        self._processes = []
+
+        for _ in range(self.workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_worker, args=(worker_connection, tracker_factory),
+                                              daemon=True)
+            process.start()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def __enter__(self) -> 'TrackerPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """ Stop all the workers. The tracker states are lost. """
+        for connection in self._connections:
+            connection.send(None)
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def get_worker(self, stream_id: Hashable) -> int:
+        """ The worker that hosts this stream. Stable across runs, so streams always land on the same shard. """
+        return zlib.crc32(repr(stream_id).encode("utf-8")) % max(1, self.workers)
+
+    # ===================================================================================================
+    # Processing.
+    # ===================================================================================================
+
+    def submit(self, submissions: List[Submission]) -> List[StreamResult]:
+        """ Process a batch of frames across all the workers in parallel.
+        Returns one result per submission, in the same order. """
+        if self.workers == 0:
+            return _process_batch(self._trackers, self.tracker_factory, submissions)
+
+        # Split the batch by worker, remembering where each result goes back to.
+        shards: Dict[int, List[int]] = defaultdict(list)
+        for i, submission in enumerate(submissions):
+            shards[self.get_worker(submission[0])].append(i)
+
+        for worker, indices in shards.items():
+            self._connections[worker].send(("process", [submissions[i] for i in indices]))
+
+        # Collect every reply before raising, so no worker is left with an unread message.
+        replies = {worker: self._connections[worker].recv() for worker in shards}
+        results: List[StreamResult] = [None] * len(submissions)
+        for worker, indices in shards.items():
+            for i, result in zip(indices, self._unpack(replies[worker])):
+                results[i] = result
+        return results
+
+    def remove(self, stream_id: Hashable) -> None:
+        """ Drop the tracker of a stream that has ended. """
+        if self.workers == 0:
+            self._trackers.pop(stream_id, None)
+            return
+
+        worker = self.get_worker(stream_id)
+        self._connections[worker].send(("remove", stream_id))
+        self._unpack(self._connections[worker].recv())
+
+    @staticmethod
+    def _unpack(reply: Tuple[str, object]):
+        status, payload = reply
+        if status == "error":
+            raise payload
+        return payload
+
+
+# ======================================================================================================================
+# Worker side.
+# ======================================================================================================================
+
+
+def process_submission(tracker: Tracker, stream_id: Hashable, frame_index: int, regions: List[TrackingRegion],
+                       image: np.ndarray = None) -> StreamResult:
+    """ Run one frame through the tracker, and collect the result. With the frame's image, the new tracklets also
+    get their thumbnails (see Tracker.save_image) before the result is collected. """
+    tracker.process(regions, frame_index)
+    if image is not None:
+        tracker.save_image(image)
+    return StreamResult(stream_id, frame_index, tracker.get_live_regions(), tracker.get_lost_regions())
+
+
+def _process_batch(trackers: Dict[Hashable, Tracker], tracker_factory: Callable[[], Tracker],
+                   submissions: List[Submission]) -> List[StreamResult]:
+    results: List[StreamResult] = []
+    for stream_id, frame_index, regions in submissions:
+        if stream_id not in trackers:
+            trackers[stream_id] = tracker_factory()
+        results.append(process_submission(trackers[stream_id], stream_id, frame_index, regions))
+    return results
+
+
+def _run_worker(connection, tracker_factory: Callable[[], Tracker]):
+    """ Worker loop: keep the trackers of this shard, and process whatever batches come in. """
+    trackers: Dict[Hashable, Tracker] = {}
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+
+        command, payload = message
+        try:
+            if command == "process":
+                connection.send(("ok", _process_batch(trackers, tracker_factory, payload)))
+            elif command == "remove":
+                trackers.pop(payload, None)
+                connection.send(("ok", None))
+            else:
+                connection.send(("error", ValueError("Unknown command: {}".format(command))))
+        except Exception as e:
+            connection.send(("error", e))
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+Save and restore the state of a Tracker (active tracklets, counters, motion state and track frames) as a compact
+binary blob. Everything is packed into flat NumPy arrays inside an .npz, so there are no pickled objects:
+dumping is fast enough to checkpoint often, and loading a blob never runs arbitrary code.
+
+Only the last frames of each tracklet are saved by default, which is all that tracking needs to carry on (the last
+one to match and smooth against, and the one before it for the velocity). The whole history is opt-in.
+Raw regions are saved as int32 rects. Display regions are only saved where they cannot be rebuilt from the raw
+region: lazy (headless) frames make theirs again when they are read, as they would have.
+
+Not included: finished tracklets, the tracklet thumbnails (save_image fills them again), the re-identification
+gallery, and the arbitrary TrackingRegion.data of each frame.
+"""
+
+import io
+from typing import List
+
+import numpy as np
+
+from tools.tracking.track_frame import TrackFrame
+from tools.tracking.tracking_region import TrackingRegion
+from tools.util.region import get_rects
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+_VERSION = 3
+
+# Frames kept per tracklet, unless the whole history is saved.
+_RESUME_FRAMES = 2
+
+
+def dump(tracker: 'Tracker', full_history: bool = False) -> bytes:
+    """ Pack the active state of the tracker into an .npz blob. """
+    tracklets = tracker.active_tracklets
+    histories = [_get_saved_frames(t.track_frames, full_history) for t in tracklets]
+    frames = [frame for history in histories for frame in history]
+    raw = [f.raw_region for f in frames]
+    kept_display = [f.display_region for f in frames if f.display and not f.lazy]
+
+    labels = sorted({r.label for r in raw if r.label is not None})
+    codes = {label: i for i, label in enumerate(labels)}
+
+    arrays = {
+        "version": np.array([_VERSION]),
+        "frame_index": np.array([tracker.frame_index]),
+        "identity_count": np.array([tracker.identity_count]),
+
+        # Tracklets.
+        "state": np.array([t.get_state() for t in tracklets], dtype=np.int32).reshape(-1, 9),
+        "color": np.array([t.color for t in tracklets], dtype=np.int32).reshape(-1, 3),
+        "red_fade": np.array([t.red_fade for t in tracklets], dtype=bool),
+        "frame_count": np.array([len(h) for h in histories], dtype=np.int32),
+        "identity": np.array([t.identity for t in tracklets], dtype=np.int64),
+
+        # Track frames, flattened across all the tracklets.
+        "frame": np.array([f.frame for f in frames], dtype=np.int64),
+        "frame_params": np.array([(f.ratio_lock, f.scale_factor) for f in frames], dtype=np.float64).reshape(-1, 2),
+        "frame_flags": np.array([(f.display, f.lazy) for f in frames], dtype=bool).reshape(-1, 2),
+        "raw_rect": get_rects(raw).astype(np.int32),
+        "display_state": np.array([r.get_state() for r in kept_display], dtype=np.int32).reshape(-1, 8),
+        "confidence": np.array([r.confidence for r in raw], dtype=np.float64),
+        "labels": np.array(labels, dtype=str),
+        "label_code": np.array([codes.get(r.label, -1) for r in raw], dtype=np.int32),
+    }
+
+    if tracker.motion is not None:
+        arrays["motion_mean"], arrays["motion_covariance"] = \
+            tracker.motion.get_state([t.motion_slot for t in tracklets])
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def load(tracker: 'Tracker', data: bytes) -> None:
+    """ Replace the state of the tracker with the snapshot. """
+    arrays = np.load(io.BytesIO(data), allow_pickle=False)
+    if int(arrays["version"][0]) != _VERSION:
+        raise Exception("Invalid Input", "Unsupported snapshot version {}.".format(int(arrays["version"][0])))
+
+    tracker.reset()
+    tracker.frame_index = int(arrays["frame_index"][0])
+
+    frames = _load_frames(arrays)
+    tracklets = tracker._create_tracklets(len(arrays["state"]))
+    frame_offset = 0
+    for tracklet, state, color, red_fade, frame_count, identity in zip(
+            tracklets, arrays["state"].tolist(), arrays["color"].tolist(), arrays["red_fade"].tolist(),
+            arrays["frame_count"].tolist(), arrays["identity"].tolist()):
+        tracklet.set_state(tuple(state))
+        tracklet.color = tuple(color)
+        tracklet.red_fade = red_fade
+        tracklet.identity = identity
+        tracklet.track_frames.extend(frames[frame_offset:frame_offset + frame_count])
+        frame_offset += frame_count
+
+    tracker.active_tracklets = tracklets
+    tracker.all_tracklets = list(tracklets)
+    tracker.identity_count = int(arrays["identity_count"][0])
+
+    if tracker.motion is not None and len(tracker.active_tracklets) > 0:
+        tracker._start_motion(tracker.active_tracklets)
+        if "motion_mean" in arrays:
+            slots = [t.motion_slot for t in tracker.active_tracklets]
+            tracker.motion.set_state(slots, arrays["motion_mean"], arrays["motion_covariance"])
+
+
+def _get_saved_frames(track_frames, full_history: bool) -> List[TrackFrame]:
+    if full_history or len(track_frames) <= _RESUME_FRAMES:
+        return list(track_frames)
+    return [track_frames[i] for i in range(-_RESUME_FRAMES, 0)]
+
+
+def _load_frames(arrays) -> List[TrackFrame]:
+    frames = []
+    labels = arrays["labels"].tolist()
+    display_states = iter(arrays["display_state"].tolist())
+    for frame_index, (ratio_lock, scale_factor), (display, lazy), (left, right, top, bottom), confidence, code in zip(
+            arrays["frame"].tolist(), arrays["frame_params"].tolist(), arrays["frame_flags"].tolist(),
+            arrays["raw_rect"].tolist(), arrays["confidence"].tolist(), arrays["label_code"].tolist()):
+
+        label = labels[code] if code >= 0 else None
+        track_frame = TrackFrame(ratio_lock=ratio_lock, scale_factor=scale_factor, display=display, lazy=lazy)
+        track_frame.frame = frame_index
+        track_frame.raw_region = _load_region(confidence, label)
+        track_frame.raw_region.set_rect(left, right, top, bottom)
+        if display and not lazy:  # Otherwise the display region is made from the raw one when it is read.
+            track_frame.display_region = _load_region(confidence, label)
+            track_frame.display_region.set_state(next(display_states))
+        frames.append(track_frame)
+    return frames
+
+
+def _load_region(confidence: float, label: str) -> TrackingRegion:
+    region = TrackingRegion()
+    region.confidence = confidence
+    region.label = label
+    return region
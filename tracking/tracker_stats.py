@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-stage instrumentation for a Tracker. Give a TrackerStats to a Tracker, and every call to process records how
+long each stage of the frame took, how many (tracklet, detection) pairs passed the gate, and how many tracklets
+were active after it. The last few hundred frames are kept in ring buffers, to be summarized on demand:
+
+    tracker = ProximityTracker(stats=TrackerStats())
+    ...
+    summary = tracker.stats.get_summary()  # {"convert_ms_mean": ..., "pairs_mean": ..., ...}
+
+Without one, the tracker skips all of this, so it costs nothing.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TrackerStats:
+
+    # The stages of a frame, in order.
+    CONVERT = 0  # Detections to TrackFrames.
+    GATING = 1  # Finding the candidate pairs.
+    MATCHING = 2  # Assigning the candidate pairs.
+    UPDATE = 3  # Merging the matches, counting hits and misses, starting new tracklets.
+    PRUNING = 4  # Removing and retiring the dead tracklets.
+    STAGES = ("convert", "gating", "matching", "update", "pruning")
+
+    def __init__(self, window: int = 300):
+        self.window: int = window  # Frames kept for the rolling aggregates.
+        self.frame_count: int = 0  # Frames recorded since the last reset, including the ones that rolled out.
+
+        # One row per frame, in a ring. Row frame_count % window is the one being recorded.
+        self._durations: np.ndarray = np.zeros((window, len(self.STAGES)))  # Seconds.
+        self._pairs: np.ndarray = np.zeros(window, dtype=np.int64)
+        self._active: np.ndarray = np.zeros(window, dtype=np.int64)
+
+        self._row: int = 0
+        self._last_time: float = 0.0
+
+    def reset(self):
+        self.frame_count = 0
+        self._row = 0
+
+    # ===================================================================================================
+    # Recording, called by the tracker.
+    # ===================================================================================================
+
+    def start(self) -> None:
+        """ Start recording a frame. """
+        self._row = self.frame_count % self.window
+        self._durations[self._row] = 0.0
+        self._pairs[self._row] = 0
+        self._last_time = time.perf_counter()
+
+    def lap(self, stage: int) -> None:
+        """ Add the time since the last lap (or the start) to the stage. A stage can be lapped many times. """
+        now = time.perf_counter()
+        self._durations[self._row, stage] += now - self._last_time
+        self._last_time = now
+
+    def add_pairs(self, count: int) -> None:
+        self._pairs[self._row] += count
+
+    def finish(self, active_count: int) -> None:
+        """ Finish recording the frame, with the number of tracklets that are still active. """
+        self._active[self._row] = active_count
+        self.frame_count += 1
+
+    # ===================================================================================================
+    # Aggregates.
+    # ===================================================================================================
+
+    def get_durations(self, stage: int) -> np.ndarray:
+        """ The seconds spent in the stage on each frame of the window, from the oldest frame to the newest. """
+        return self._get_window(self._durations[:, stage])
+
+    def get_pair_counts(self) -> np.ndarray:
+        return self._get_window(self._pairs)
+
+    def get_active_counts(self) -> np.ndarray:
+        return self._get_window(self._active)
+
+    def get_summary(self) -> Dict[str, float]:
+        """ A flat dict of the rolling aggregates over the window, ready to be exported as metrics: the mean and
+        95th percentile of each stage (and of the whole frame) in milliseconds, and the mean and max of the pair
+        and active tracklet counts. """
+        summary = OrderedDict([("frames", float(self.frame_count))])
+        count = min(self.frame_count, self.window)
+        if count == 0:
+            return summary
+
+        durations = self._get_window(self._durations) * 1000
+        columns = [(name, durations[:, i]) for i, name in enumerate(self.STAGES)]
+        columns.append(("frame", durations.sum(axis=1)))
+        for name, values in columns:
+            summary[name + "_ms_mean"] = float(values.mean())
+            summary[name + "_ms_p95"] = float(np.percentile(values, 95))
+
+        for name, values in (("pairs", self.get_pair_counts()), ("active_tracklets", self.get_active_counts())):
+            summary[name + "_mean"] = float(values.mean())
+            summary[name + "_max"] = float(values.max())
+        return summary
+
+    def _get_window(self, values: np.ndarray) -> np.ndarray:
+        """ The recorded rows of a ring buffer, oldest first. """
+        if self.frame_count <= self.window:
+            return values[:self.frame_count].copy()
+        split = self.frame_count % self.window
+        return np.concatenate([values[split:], values[:split]])
@@ -4,26 +4,113 @@
 A sub-class of region with some added meta-data for better tracking performance.
 """
 
+from collections.abc import MutableMapping
+
 from tools.util.region import Region
 
 __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
 
 
+# Marks a key that was deleted in the overlay, but still exists in the shared base.
+_DELETED = object()
+
+
+class RegionData(MutableMapping):
+    """ Copy-on-write metadata dict. Copies share the same read-only base dict, and each copy keeps its own
+    writes in a small overlay on top of it, so copying is free and copies never see each other's changes.
+    The values themselves are not copied. """
+
+    __slots__ = ("_base", "_overlay")
+
+    def __init__(self, data: dict = None):
+        self._base: dict = dict(data) if data else {}
+        self._overlay: dict = None
+
+    def copy(self) -> 'RegionData':
+        # Fold our own changes into a fresh base first, so overlays never stack up.
+        if self._overlay:
+            self._base = self._flatten()
+            self._overlay = None
+
+        data = RegionData.__new__(RegionData)
+        data._base = self._base
+        data._overlay = None
+        return data
+
+    def _flatten(self) -> dict:
+        data = dict(self._base)
+        if self._overlay:
+            for key, value in self._overlay.items():
+                if value is _DELETED:
+                    del data[key]
+                else:
+                    data[key] = value
+        return data
+
+    def __getitem__(self, key):
+        if self._overlay is not None and key in self._overlay:
+            value = self._overlay[key]
+            if value is _DELETED:
+                raise KeyError(key)
+            return value
+        return self._base[key]
+
+    def __setitem__(self, key, value):
+        if self._overlay is None:
+            self._overlay = {}
+        self._overlay[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if key in self._base:
+            self[key] = _DELETED
+        else:
+            del self._overlay[key]
+
+    def __contains__(self, key):
+        if self._overlay is not None and key in self._overlay:
+            return self._overlay[key] is not _DELETED
+        return key in self._base
+
+    def __iter__(self):
+        if not self._overlay:
+            return iter(self._base)
+        return iter(self._flatten())
+
+    def __len__(self):
+        if not self._overlay:
+            return len(self._base)
+        return len(self._flatten())
+
+    def __repr__(self):
+        return repr(self._flatten())
+
+
 class TrackingRegion(Region):
 
+    __slots__ = ("confidence", "label", "_data")
+
     def __init__(self, left=0, right=0, top=0, bottom=0):
         super().__init__(left, right, top, bottom)
         self.confidence: float = 0.0
         self.label: str = None
-        self.data: dict = {}  # Arbitrary data pointer.
+        self._data: RegionData = RegionData()  # Arbitrary data pointer.
+
+    @property
+    def data(self) -> RegionData:
+        return self._data
+
+    @data.setter
+    def data(self, value: dict):
+        self._data = value.copy() if isinstance(value, RegionData) else RegionData(value)
 
     def clone(self) -> 'TrackingRegion':
-        """ Overload the clone function to include all the new data. """
+        """ Overload the clone function to include all the new data. The data is copy-on-write. """
         region = TrackingRegion()
         region.set_rect(self.left, self.right, self.top, self.bottom)
         region.confidence = self.confidence
         region.label = self.label
-        region.data = self.data
+        region._data = self._data.copy()
         return region
-
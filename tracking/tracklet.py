@@ -4,11 +4,13 @@
 Tracklet: A clustered group of TrackFrames belonging to the same object.
 """
 
+from collections import deque
 from enum import Enum
-from typing import List, Tuple
+from typing import Deque, Tuple
 from tools.util import core
 from tools.util.simple_filter import SimpleFilter
 from .track_frame import TrackFrame
+from .tracker_config import TrackerConfig
 
 __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
@@ -31,14 +33,21 @@ class Tracklet:
     _ANIM_KILL_MAX = 10
 
     def __init__(self, hit_limit: int = 3, miss_limit: int = 7,
-                 color: Tuple = (255, 255, 255), red_fade: bool=False):
-        self.track_frames: List[TrackFrame] = []
-
-        # TODO: We should probably allow this for config passing.
-
-        # Smoothing Filters.
-        self._position_filter: SimpleFilter = SimpleFilter(0.5)
-        self._size_filter: SimpleFilter = SimpleFilter(0.5)
+                 color: Tuple = (255, 255, 255), red_fade: bool=False, history_size: int = None,
+                 config: TrackerConfig = None):
+
+        # Ring buffer of the most recent frames. Only the last one is needed for tracking, so the history can be
+        # bounded to keep long running streams from growing. None keeps every frame.
+        self.track_frames: Deque[TrackFrame] = deque(maxlen=history_size)
+
+        # Smoothing Filters. None if the config turns smoothing off.
+        config = config if config is not None else TrackerConfig()
+        self._headless: bool = config.headless
+        self._position_filter: SimpleFilter = None
+        self._size_filter: SimpleFilter = None
+        if config.smoothing and config.display and not config.headless:
+            self._position_filter = SimpleFilter(config.position_smoothing)
+            self._size_filter = SimpleFilter(config.size_smoothing)
 
         # Consecutive.
         self._hit_counter: int = 0
@@ -57,6 +66,8 @@ class Tracklet:
         self.visual_state: VisualState = VisualState.NORMAL
 
         self.image = None
+        self.identity: int = None  # Given by the tracker. Kept by an object that is re-identified.
+        self.motion_slot: int = None  # Slot in the tracker's motion model, if it has one.
 
     # ===================================================================================================
     # Core Public Functions.
@@ -72,13 +83,24 @@ class Tracklet:
         if register_hit:
             self.update(True)
 
-    def update(self, hit: bool=True):
-        """ This function should be called every frame, to either register a hit or miss. """
+    def update(self, hit: bool=True, frames: int=1):
+        """ This function should be called every frame, to either register a hit or miss. If detections are sparse,
+        the hit or miss counts for all the frames since the last call. """
         if self._lost:
             self._step_kill_animation()
             return
 
-        self._register(hit)
+        self._register(hit, frames)
+
+    def get_state(self) -> Tuple:
+        """ The counters and state flags, for serialization. See set_state. """
+        return (self._hit_counter, self._miss_counter, self._hit_limit, self._miss_limit, self._activated,
+                self._lost, self._anim_show_counter, self._anim_kill_counter, self.visual_state.value)
+
+    def set_state(self, state: Tuple) -> None:
+        (self._hit_counter, self._miss_counter, self._hit_limit, self._miss_limit, self._activated,
+         self._lost, self._anim_show_counter, self._anim_kill_counter, visual_state) = state
+        self.visual_state = VisualState(visual_state)
 
     # ===================================================================================================
     # Private Functions.
@@ -86,21 +108,21 @@ class Tracklet:
 
     def _filter_frame(self, track_frame: TrackFrame) -> TrackFrame:
         """ Smoothly filter the position and size of the new frame. """
-        if len(self.track_frames) > 0:
+        if self._position_filter is not None and len(self.track_frames) > 0:
             pt: TrackFrame = self.track_frames[-1]
-            track_frame.x = self._position_filter.process(track_frame.x, pt.x)
-            track_frame.y = self._position_filter.process(track_frame.y, pt.y)
-            track_frame.width = self._size_filter.process(track_frame.width, pt.width)
-            track_frame.height = self._size_filter.process(track_frame.height, pt.height)
+            track_frame.set_center_size(self._position_filter.process(track_frame.x, pt.x),
+                                        self._position_filter.process(track_frame.y, pt.y),
+                                        self._size_filter.process(track_frame.width, pt.width),
+                                        self._size_filter.process(track_frame.height, pt.height))
         return track_frame
 
-    def _register(self, hit: bool=True):
+    def _register(self, hit: bool=True, frames: int=1):
         """ Register a hit or a miss, and update the counters. """
         if hit:
-            self._hit_counter += 1
+            self._hit_counter += frames
             self._miss_counter = 0
         else:
-            self._miss_counter += 1
+            self._miss_counter += frames
             self._hit_counter = 0
 
         self._check_and_activate()
@@ -151,6 +173,7 @@ class Tracklet:
 
     @property
     def first_frame(self) -> TrackFrame:
+        """ The oldest frame still kept in the history. """
         return self.track_frames[0]
 
     @property
@@ -169,6 +192,23 @@ class Tracklet:
     # Visual and animation functions.
     # ======================================================================================================================
 
+    @property
+    def color(self) -> Tuple:
+        """ The color of the display region while the tracklet is not lost. """
+        return self._color
+
+    @color.setter
+    def color(self, value: Tuple):
+        self._color = value
+
+    @property
+    def red_fade(self) -> bool:
+        return self._red_fade
+
+    @red_fade.setter
+    def red_fade(self, value: bool):
+        self._red_fade = value
+
     @property
     def raw_region(self):
         """ Get the latest raw region of this Tracklet. """
@@ -176,8 +216,12 @@ class Tracklet:
 
     @property
     def display_region(self):
-        """ Gets the display region to show for this current frame."""
+        """ Gets the display region to show for this current frame, with the tracklet's identity in its data. """
         last_region = self.last_frame.display_region.clone()
+        last_region.data["identity"] = self.identity
+        if self._headless:
+            return last_region
+
         if self.is_lost:
             last_region.data["color"] = self._get_kill_animation_color()
         else:
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""
+TrackletBank: the hit/miss counters and state flags of many Tracklets, stored in parallel arrays.
+This turns the per-frame bookkeeping (register hits and misses, activate, lose, step the kill animation and prune)
+into a few vectorized operations. The Tracklet objects handed out are lightweight views into the bank.
+The motion state, if any, already lives in the arrays of the tracker's KalmanFilter.
+"""
+
+from collections import deque
+from typing import Deque, List, Tuple
+
+import numpy as np
+
+from tools.util.simple_filter import SimpleFilter
+from .track_frame import TrackFrame
+from .tracker_config import TrackerConfig
+from .tracklet import Tracklet, VisualState
+
+__author__ = "Jakrin Juangbhanich"
+__email__ = "juangbhanich.k@gmail.com"
+
+
+class TrackletBank:
+
+    def __init__(self, capacity: int = 256):
+        self.hit_counter: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.miss_counter: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.hit_limit: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.miss_limit: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.anim_kill_counter: np.ndarray = np.zeros(capacity, dtype=np.int32)
+        self.activated: np.ndarray = np.zeros(capacity, dtype=bool)
+        self.lost: np.ndarray = np.zeros(capacity, dtype=bool)
+        self.killed: np.ndarray = np.zeros(capacity, dtype=bool)
+        self.used: np.ndarray = np.zeros(capacity, dtype=bool)
+
+    def reset(self):
+        self.used[:] = False
+
+    # ===================================================================================================
+    # Slot management.
+    # ===================================================================================================
+
+    def create(self, count: int, hit_limit: int = 3, miss_limit: int = 7, color: Tuple = (255, 255, 255),
+               red_fade: bool = False, history_size: int = None, config: TrackerConfig = None) -> List['TrackletView']:
+        """ Create a batch of new tracklets, all with the same settings. """
+        # The smoothing filters have no state, so the whole batch can share them.
+        config = config if config is not None else TrackerConfig()
+        position_filter, size_filter = None, None
+        if config.smoothing and config.display and not config.headless:
+            position_filter = SimpleFilter(config.position_smoothing)
+            size_filter = SimpleFilter(config.size_smoothing)
+
+        slots = self._allocate(count)
+        for array in (self.hit_counter, self.miss_counter, self.anim_kill_counter):
+            array[slots] = 0
+        for array in (self.activated, self.lost, self.killed):
+            array[slots] = False
+        self.hit_limit[slots] = hit_limit
+        self.miss_limit[slots] = miss_limit
+        self.used[slots] = True
+        return [TrackletView(self, slot, color, red_fade, history_size, position_filter, size_filter,
+                             config.headless) for slot in slots.tolist()]
+
+    def free(self, slots: np.ndarray) -> None:
+        """ Release the slots. The views using them must not be read anymore. """
+        self.used[np.asarray(slots, dtype=np.int64)] = False
+
+    def _allocate(self, count: int) -> np.ndarray:
+        free = np.flatnonzero(~self.used)
+        if len(free) < count:
+            self._grow(len(self.used) - len(free) + count)
+            free = np.flatnonzero(~self.used)
+        return free[:count]
+
+    def _grow(self, required: int) -> None:
+        extra = max(required, len(self.used) * 2) - len(self.used)
+        for name in ("hit_counter", "miss_counter", "hit_limit", "miss_limit", "anim_kill_counter",
+                     "activated", "lost", "killed", "used"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros(extra, dtype=array.dtype)]))
+
+    @staticmethod
+    def get_slots(tracklets: List['TrackletView']) -> np.ndarray:
+        return np.fromiter((t.slot for t in tracklets), dtype=np.int64, count=len(tracklets))
+
+    # ===================================================================================================
+    # Batched bookkeeping. These follow Tracklet.update exactly, but for many slots at once.
+    # ===================================================================================================
+
+    def register(self, slots: np.ndarray, hits: np.ndarray, frames: int = 1) -> None:
+        """ Register a hit or a miss for each slot, counting for a number of frames. Lost slots step their kill
+        animation instead. """
+        slots = np.asarray(slots, dtype=np.int64)
+        hits = np.asarray(hits, dtype=bool)
+
+        lost = self.lost[slots]
+        killing = slots[lost]
+        self.anim_kill_counter[killing] += 1
+        self.killed[killing] |= self.anim_kill_counter[killing] >= Tracklet._ANIM_KILL_MAX
+
+        slots = slots[~lost]
+        hits = hits[~lost]
+        self.hit_counter[slots] = np.where(hits, self.hit_counter[slots] + frames, 0)
+        self.miss_counter[slots] = np.where(hits, 0, self.miss_counter[slots] + frames)
+        self.activated[slots] |= self.hit_counter[slots] >= self.hit_limit[slots]
+
+        # If it has never been activated, kill it immediately.
+        newly_lost = slots[self.miss_counter[slots] >= self.miss_limit[slots]]
+        self.lost[newly_lost] = True
+        self.killed[newly_lost] |= ~self.activated[newly_lost]
+
+    def is_kept(self, slots: np.ndarray) -> np.ndarray:
+        """ Which of the slots are still active: not lost, or still showing the kill animation. """
+        slots = np.asarray(slots, dtype=np.int64)
+        return ~self.lost[slots] | (self.activated[slots] & ~self.killed[slots])
+
+
+class TrackletView(Tracklet):
+    """ A Tracklet whose counters and state flags live in a TrackletBank. The frames, colors and image are still
+    kept on the object, since they are not touched by the per-frame bookkeeping. """
+
+    def __init__(self, bank: TrackletBank, slot: int, color: Tuple = (255, 255, 255), red_fade: bool = False,
+                 history_size: int = None, position_filter: SimpleFilter = None, size_filter: SimpleFilter = None,
+                 headless: bool = False):
+        # Not calling the base constructor on purpose: all of its state is in the bank.
+        self.bank: TrackletBank = bank
+        self.slot: int = slot
+        self.track_frames: Deque[TrackFrame] = deque(maxlen=history_size)
+        self._position_filter: SimpleFilter = position_filter  # None for no smoothing.
+        self._size_filter: SimpleFilter = size_filter
+        self._color = color
+        self._red_fade: bool = red_fade
+        self._headless: bool = headless
+        self.image = None
+        self.identity: int = None
+        self.motion_slot: int = None
+
+    def update(self, hit: bool=True, frames: int=1):
+        self.bank.register(np.array([self.slot]), np.array([hit]), frames)
+
+    def get_state(self) -> Tuple:
+        b, i = self.bank, self.slot
+        return (int(b.hit_counter[i]), int(b.miss_counter[i]), int(b.hit_limit[i]), int(b.miss_limit[i]),
+                bool(b.activated[i]), bool(b.lost[i]), 0, int(b.anim_kill_counter[i]), self.visual_state.value)
+
+    def set_state(self, state: Tuple) -> None:
+        b, i = self.bank, self.slot
+        (b.hit_counter[i], b.miss_counter[i], b.hit_limit[i], b.miss_limit[i], b.activated[i], b.lost[i],
+         _, b.anim_kill_counter[i], visual_state) = state
+        b.killed[i] = visual_state == VisualState.KILLED.value
+
+    @property
+    def visual_state(self) -> VisualState:
+        return VisualState.KILLED if self.bank.killed[self.slot] else VisualState.NORMAL
+
+    @property
+    def _anim_kill_counter(self) -> int:
+        return int(self.bank.anim_kill_counter[self.slot])
+
+    @property
+    def is_recent(self) -> bool:
+        return bool(self.bank.hit_counter[self.slot] > 0)
+
+    @property
+    def is_live(self) -> bool:
+        return bool(self.bank.activated[self.slot] and not self.bank.lost[self.slot])
+
+    @property
+    def is_activated(self) -> bool:
+        return bool(self.bank.activated[self.slot])
+
+    @property
+    def is_lost(self) -> bool:
+        return bool(self.bank.lost[self.slot])
+
+    @property
+    def is_displayable(self) -> bool:
+        return bool(self.bank.activated[self.slot] and not self.bank.killed[self.slot])
+
+    @property
+    def miss_limit(self) -> int:
+        return int(self.bank.miss_limit[self.slot])
+
+    @property
+    def hit_limit(self) -> int:
+        return int(self.bank.hit_limit[self.slot])
@@ -2,15 +2,26 @@
 
 """
 A region is essentially a rectangle with some extra functionality. I've made it so the attributes will update each other.
+The update is lazy: setting attributes only marks the region as dirty, and it is calibrated on the next read.
 """
 
 import math
+from typing import List, Type, Union
+
+import numpy as np
 
 __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
 
 
 class Region:
+
+    __slots__ = ("_left", "_right", "_top", "_bottom", "_x", "_y", "_width", "_height", "_force_int", "_pending")
+
+    # Calibration is deferred until an attribute is read. This marks which side was set last.
+    _PENDING_RECT = 1
+    _PENDING_XY = 2
+
     def __init__(self, left=0, right=0, top=0, bottom=0, force_int: bool = True):
 
         # Rect. Origin (0, 0) is top-left.
@@ -29,6 +40,7 @@ class Region:
 
         # Data
         self._force_int = force_int
+        self._pending = None
 
         # Initialize
         self.set_rect(left, right, top, bottom)
@@ -47,23 +59,31 @@ class Region:
         if bottom < top:
             raise Exception("Invalid Input", "Bottom ({}) must be greater than top ({}).".format(top, bottom))
 
+        self._defer(self._PENDING_RECT)
         self._left = left
         self._right = right
         self._top = top
         self._bottom = bottom
-        self._calibrate_to_rect()
 
     def set_xy(self, x=None, y=None):
+        self._defer(self._PENDING_XY)
         if x is not None:
             self._x = x
         if y is not None:
             self._y = y
-        self._calibrate_to_xy()
 
     def set_size(self, width, height):
+        self._defer(self._PENDING_XY)
+        self._width = width
+        self._height = height
+
+    def set_center_size(self, x, y, width, height):
+        """ Set the position and size together, with a single calibration. """
+        self._defer(self._PENDING_XY)
+        self._x = x
+        self._y = y
         self._width = width
         self._height = height
-        self._calibrate_to_xy()
 
     # ======================================================================================================================
     # Utility functions.
@@ -71,19 +91,32 @@ class Region:
 
     def contains(self, x, y) -> bool:
         """" Checks if the given x, y position is within the area of this region. """
-        if x < self._left or x > self._right or y < self._top or y > self._bottom:
+        if x < self.left or x > self.right or y < self.top or y > self.bottom:
             return False
         return True
 
     def is_in_bounds(self, width, height) -> bool:
         """ Check if this entire region is contained within the bounds of a given stage size."""
-        if self._top < 0 \
-                or self._bottom > height \
-                or self._left < 0 \
-                or self._right > width:
+        if self.top < 0 \
+                or self.bottom > height \
+                or self.left < 0 \
+                or self.right > width:
             return False
         return True
 
+    def get_state(self) -> tuple:
+        """ The exact internal state (rect, center and size), for serialization. """
+        if self._pending is not None:
+            self._calibrate()
+        return self._left, self._right, self._top, self._bottom, self._x, self._y, self._width, self._height
+
+    def set_state(self, state) -> None:
+        """ Restore an exact state from get_state, without recalibrating. """
+        self._left, self._right, self._top, self._bottom, self._x, self._y, self._width, self._height = state
+        self._pending = None
+        if self._force_int:
+            self.convert_to_int()
+
     def convert_to_int(self) -> None:
         self._width = int(self._width)
         self._height = int(self._height)
@@ -98,6 +131,21 @@ class Region:
     # Private calibration functions.
     # ======================================================================================================================
 
+    def _defer(self, pending: int) -> None:
+        """ Mark one side as modified. If the other side has un-calibrated changes, flush those first. """
+        if self._pending is not None and self._pending != pending:
+            self._calibrate()
+        self._pending = pending
+
+    def _calibrate(self) -> None:
+        """ Apply the pending calibration, if there is any. """
+        pending = self._pending
+        self._pending = None
+        if pending == self._PENDING_RECT:
+            self._calibrate_to_rect()
+        elif pending == self._PENDING_XY:
+            self._calibrate_to_xy()
+
     def _calibrate_to_rect(self) -> None:
 
         if self._force_int:
@@ -145,75 +193,91 @@ class Region:
 
     @property
     def x(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._x
 
     @x.setter
     def x(self, value):
+        self._defer(self._PENDING_XY)
         self._x = value
-        self._calibrate_to_xy()
 
     @property
     def y(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._y
 
     @y.setter
     def y(self, value):
+        self._defer(self._PENDING_XY)
         self._y = value
-        self._calibrate_to_xy()
 
     @property
     def left(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._left
 
     @left.setter
     def left(self, value):
+        self._defer(self._PENDING_RECT)
         self._left = value
-        self._calibrate_to_rect()
 
     @property
     def right(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._right
 
     @right.setter
     def right(self, value):
+        self._defer(self._PENDING_RECT)
         self._right = value
-        self._calibrate_to_rect()
 
     @property
     def top(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._top
 
     @top.setter
     def top(self, value):
+        self._defer(self._PENDING_RECT)
         self._top = value
-        self._calibrate_to_rect()
 
     @property
     def bottom(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._bottom
 
     @bottom.setter
     def bottom(self, value):
+        self._defer(self._PENDING_RECT)
         self._bottom = value
-        self._calibrate_to_rect()
 
     @property
     def width(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._width
 
     @width.setter
     def width(self, value):
+        self._defer(self._PENDING_XY)
         self._width = value
-        self._calibrate_to_xy()
 
     @property
     def height(self):
+        if self._pending is not None:
+            self._calibrate()
         return self._height
 
     @height.setter
     def height(self, value):
+        self._defer(self._PENDING_XY)
         self._height = value
-        self._calibrate_to_xy()
 
     @property
     def biggest_edge(self) -> int:
@@ -237,3 +301,196 @@ class Region:
     def fast_distance(r1: 'Region', r2: 'Region'):
         """ A quicker way of calculating approximate distance. Lower accuracy but faster results."""
         return abs(r1.x - r2.x) + abs(r1.y - r2.y)
+
+
+class RegionArray:
+    """ A struct-of-arrays batch of regions, backed by a single (N, 4) array of [left, right, top, bottom].
+    The vectorized operations follow the same integer rounding as the Region calibration functions, but the size is
+    always derived from the rect. Region keeps its odd width/height around, so chained ops can differ by a pixel. """
+
+    def __init__(self, rects: np.ndarray = None, force_int: bool = True):
+        self._force_int = force_int
+        dtype = np.int64 if force_int else np.float64
+        if rects is None:
+            rects = np.zeros((0, 4), dtype=dtype)
+        self.rects: np.ndarray = np.asarray(rects).reshape(-1, 4).astype(dtype, copy=False)
+
+    def __repr__(self):
+        return f"[RegionArray count: {len(self)}]"
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __getitem__(self, item) -> Union[Region, 'RegionArray']:
+        """ An integer index returns a Region, anything else (slice, mask, index array) returns a RegionArray. """
+        if isinstance(item, (int, np.integer)):
+            left, right, top, bottom = self.rects[item].tolist()
+            return Region(left, right, top, bottom, force_int=self._force_int)
+        return RegionArray(self.rects[item], force_int=self._force_int)
+
+    # ======================================================================================================================
+    # Conversion.
+    # ======================================================================================================================
+
+    @staticmethod
+    def from_regions(regions: List[Region], force_int: bool = True) -> 'RegionArray':
+        return RegionArray(get_rects(regions), force_int=force_int)
+
+    def to_regions(self, region_type: Type[Region] = Region) -> List[Region]:
+        """ Create a list of regions. Any Region subclass with the same constructor works, e.g. TrackingRegion. """
+        return [region_type(left, right, top, bottom) for left, right, top, bottom in self.rects.tolist()]
+
+    def clone(self) -> 'RegionArray':
+        return RegionArray(self.rects.copy(), force_int=self._force_int)
+
+    # ======================================================================================================================
+    # Vectorized attributes.
+    # ======================================================================================================================
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.rects[:, 0]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.rects[:, 1]
+
+    @property
+    def top(self) -> np.ndarray:
+        return self.rects[:, 2]
+
+    @property
+    def bottom(self) -> np.ndarray:
+        return self.rects[:, 3]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.right - self.left
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.bottom - self.top
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.left + self.width // 2
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.top + self.height // 2
+
+    @property
+    def biggest_edge(self) -> np.ndarray:
+        return np.maximum(self.width, self.height)
+
+    @property
+    def area(self) -> np.ndarray:
+        return self.width * self.height
+
+    @property
+    def centers(self) -> np.ndarray:
+        """ (N, 2) array of the x, y centers. """
+        return np.stack([self.x, self.y], axis=1)
+
+    # ======================================================================================================================
+    # Vectorized operations, all in place.
+    # ======================================================================================================================
+
+    def set_size(self, width: np.ndarray, height: np.ndarray) -> None:
+        """ Resize around the current centers, like Region.set_size. """
+        x, y = self.x, self.y
+        if self._force_int:
+            width = np.asarray(width).astype(np.int64)
+            height = np.asarray(height).astype(np.int64)
+        half_width = width // 2
+        half_height = height // 2
+        self.rects = np.stack([x - half_width, x + half_width, y - half_height, y + half_height], axis=1)
+
+    def expand_to_ratio(self, aspect_ratio: float = 1.0) -> None:
+        width, height = self.width, self.height
+        aspect_width = height // aspect_ratio
+        aspect_height = width // aspect_ratio
+
+        expand_width = aspect_width > width
+        expand_height = ~expand_width & (aspect_height > height)
+        new_width = np.where(expand_width, aspect_width, width)
+        new_height = np.where(expand_height, aspect_height, height)
+
+        # Region recalibrates the untouched edge too, so only the changed rows go through set_size.
+        changed = expand_width | expand_height
+        if changed.any():
+            resized = self[changed]
+            resized.set_size(new_width[changed], new_height[changed])
+            self.rects[changed] = resized.rects
+
+    def scale(self, scale_value: float = 1.0) -> None:
+        self.set_size(np.trunc(self.width * scale_value), np.trunc(self.height * scale_value))
+
+    def clip(self, width: int, height: int) -> None:
+        """ Clip all the regions to the bounds of a stage of the given size. """
+        np.clip(self.rects[:, :2], 0, width, out=self.rects[:, :2])
+        np.clip(self.rects[:, 2:], 0, height, out=self.rects[:, 2:])
+
+    def is_in_bounds(self, width: int, height: int) -> np.ndarray:
+        return (self.left >= 0) & (self.right <= width) & (self.top >= 0) & (self.bottom <= height)
+
+    # ======================================================================================================================
+    # Vectorized comparisons.
+    # ======================================================================================================================
+
+    def distance(self, other: 'RegionArray') -> np.ndarray:
+        """ (N, M) matrix of the center distances of every region here against every region in the other. """
+        delta = self.centers[:, np.newaxis, :] - other.centers[np.newaxis, :, :]
+        return np.sqrt((delta * delta).sum(axis=2))
+
+    def fast_distance(self, other: 'RegionArray') -> np.ndarray:
+        """ (N, M) matrix of the Manhattan center distances. """
+        return np.abs(self.centers[:, np.newaxis, :] - other.centers[np.newaxis, :, :]).sum(axis=2)
+
+    def iou(self, other: 'RegionArray', generalized: bool = False) -> np.ndarray:
+        """ (N, M) matrix of the IoU (or GIoU) of every region here against every region in the other. """
+        return iou_matrix(self.rects.astype(np.float64), other.rects.astype(np.float64), generalized)
+
+
+# ======================================================================================================================
+# Batched overlap functions. Rects are (N, 4) arrays of [left, right, top, bottom], in the same order as set_rect.
+# ======================================================================================================================
+
+
+def get_rects(regions: List[Region]) -> np.ndarray:
+    """ Pack the regions into an (N, 4) float array of [left, right, top, bottom]. """
+    rects = np.empty((len(regions), 4), dtype=np.float64)
+    for i, r in enumerate(regions):
+        rects[i] = (r.left, r.right, r.top, r.bottom)
+    return rects
+
+
+def iou_matrix(rects_a: np.ndarray, rects_b: np.ndarray, generalized: bool = False) -> np.ndarray:
+    """ Intersection over union of every rect in A against every rect in B, as an (N, M) matrix.
+    If generalized, returns the GIoU instead, which goes negative for boxes that are far apart. """
+    return _overlap(rects_a[:, np.newaxis, :], rects_b[np.newaxis, :, :], generalized)
+
+
+def paired_iou(rects_a: np.ndarray, rects_b: np.ndarray, generalized: bool = False) -> np.ndarray:
+    """ Intersection over union of each rect in A against the rect at the same index in B. """
+    return _overlap(rects_a, rects_b, generalized)
+
+
+def _overlap(rects_a: np.ndarray, rects_b: np.ndarray, generalized: bool) -> np.ndarray:
+    left_a, right_a, top_a, bottom_a = np.moveaxis(rects_a, -1, 0)
+    left_b, right_b, top_b, bottom_b = np.moveaxis(rects_b, -1, 0)
+
+    inter_w = np.clip(np.minimum(right_a, right_b) - np.maximum(left_a, left_b), 0, None)
+    inter_h = np.clip(np.minimum(bottom_a, bottom_b) - np.maximum(top_a, top_b), 0, None)
+    intersection = inter_w * inter_h
+    union = (right_a - left_a) * (bottom_a - top_a) + (right_b - left_b) * (bottom_b - top_b) - intersection
+    iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+    if not generalized:
+        return iou
+
+    # Penalize by the empty area of the smallest box enclosing both.
+    hull_w = np.maximum(right_a, right_b) - np.minimum(left_a, left_b)
+    hull_h = np.maximum(bottom_a, bottom_b) - np.minimum(top_a, top_b)
+    hull = hull_w * hull_h
+    return iou - np.divide(hull - union, hull, out=np.zeros_like(hull), where=hull > 0)
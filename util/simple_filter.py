@@ -13,7 +13,7 @@ class SimpleFilter:
         assert(0.0 <= factor <= 1.0)
 
         self.factor = factor
-        self.r_factor = factor
+        self.r_factor = 1.0 - factor
 
     def process(self, new_value, old_value):
         return new_value * self.factor + old_value * self.r_factor
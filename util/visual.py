@@ -4,11 +4,11 @@
 Library to do some cool visual stuff.
 """
 
-from typing import List, Tuple
+from typing import List, Tuple, Union
 import cv2
 import numpy as np
 import colorsys
-from .region import Region
+from .region import Region, RegionArray, get_rects
 
 __author__ = "Jakrin Juangbhanich"
 __email__ = "juangbhanich.k@gmail.com"
@@ -139,11 +139,12 @@ def draw_bar_segment(image, p_start: float, p_end: float, x: int, y: int, width:
 
 
 def _get_safe_bounds(near: int, far: int, max_bound: int) -> (int, int, int, int):
-    """ Finds the near/far bounds (such as left, right) for a certain max bound (width, etc). """
-    safe_near = max(0, near)
-    safe_far = min(max_bound, far)
-    near_excess = safe_near - near
-    far_excess = far - safe_far
+    """ Finds the near/far bounds (such as left, right) for a certain max bound (width, etc).
+    Without any overlap, the safe bounds are an empty range at the nearest edge. """
+    safe_near = min(max(0, near), max_bound)
+    safe_far = max(safe_near, min(max_bound, far))
+    near_excess = min(max(0, safe_near - near), far - near)
+    far_excess = min(max(0, far - safe_far), far - near)
     return safe_near, safe_far, near_excess, far_excess
 
 
@@ -162,12 +163,9 @@ def safe_extract(image: np.array, left: int, right: int, top: int, bottom: int):
     w = safe_right - safe_left
 
     # Fill the excess area with black.
-    filler = np.zeros((bottom - top, right - left, 3), dtype=np.uint8)
+    filler = np.zeros((bottom - top, right - left) + image.shape[2:], dtype=image.dtype)
     insert_bottom = top_excess + h
     insert_right = left_excess + w
-    print("")
-    print(left_excess, insert_right, w)
-    print(top_excess, insert_bottom, h)
     filler[top_excess:insert_bottom, left_excess:insert_right] = extracted_image
     return filler
 
@@ -196,3 +194,43 @@ def safe_extract_with_region(image: np.array, region: Region) -> np.array:
 def safe_implant_with_region(dst_image: np.array, src_image: np.array, region: Region) -> np.array:
     """ Plant the area from the src image into the dst image. """
     return safe_implant(dst_image, src_image, region.left, region.right, region.top, region.bottom)
+
+
+def extract_regions(image: np.array, regions: Union[List[Region], RegionArray, np.ndarray],
+                    size: Tuple[int, int] = None, out: np.ndarray = None,
+                    copy: bool = False) -> Union[List[np.ndarray], np.ndarray]:
+    """ Extract the area of each region (or [left, right, top, bottom] rect) from the image.
+    Regions inside the image are returned as views into it (unless copy is set, e.g. to keep them after the frame
+    buffer is reused). Only the ones crossing the border get a new, black padded array.
+    With a (width, height) size, every crop is resized into one (N, height, width, channels) array instead, which
+    can be given as out to reuse it between frames. """
+    if isinstance(regions, RegionArray):
+        rects = regions.rects
+    elif isinstance(regions, np.ndarray):
+        rects = regions
+    else:
+        rects = get_rects(regions)
+    rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+
+    height, width = image.shape[:2]
+    inside = (rects[:, 0] >= 0) & (rects[:, 2] >= 0) & (rects[:, 1] <= width) & (rects[:, 3] <= height)
+
+    crops: List[np.ndarray] = []
+    for (left, right, top, bottom), is_inside in zip(rects.tolist(), inside.tolist()):
+        if is_inside:
+            crop = image[top:bottom, left:right]
+            crops.append(crop.copy() if copy else crop)
+        else:
+            crops.append(safe_extract(image, left, right, top, bottom))
+
+    if size is None:
+        return crops
+
+    if out is None:
+        out = np.empty((len(crops), size[1], size[0]) + image.shape[2:], dtype=image.dtype)
+    for i, crop in enumerate(crops):
+        if crop.size == 0:
+            out[i] = 0
+        else:
+            cv2.resize(crop, size, dst=out[i])
+    return out